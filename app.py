@@ -291,302 +291,490 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+# Plotly is imported inside the methods that build figures, so a page with every
+# insight collapsed never loads plotly.express
 from database import DatabaseManager
-from data_generator import DataGenerator
+from cohort import StudentDirectory
+from eligibility import (BATCHES, ELIGIBLE_COLUMNS, ELIGIBLE_DTYPES, ELIGIBLE_FROM, PAGE_SIZES, SORT_COLUMNS,
+                         EligibilityCriteria, build_count_query, build_page_query, eligibility_where)
+from eligibility_cube import CUBE_DIMENSIONS, get_eligibility_cube
+from eligibility_engine import get_eligibility_engine
+from exporter import FORMATS, export_eligible
+from frames import to_frame
+from insights import TOP_N, fetch_insights, get_insight_memo, insight_version
+from query_stats import get_query_stats
+from ranking import DEFAULT_WEIGHTS, METRIC_NAMES, get_ranking_model
+from render_profiler import RENDER_PROFILE, RENDER_PROFILE_DIR, RenderProfiler
+from seed import seed_database
+from typing import NamedTuple, Optional
+import os
+import tempfile
+import time
+
+# 'sql' queries MySQL on every filter change; 'columnar' filters an in-memory copy
+ELIGIBILITY_ENGINE = os.getenv('ELIGIBILITY_ENGINE', 'sql')
+
+# Live "how many qualify" counts under the sliders, from a count cube over an in-memory
+# copy of the cohort; off by default since every process then loads and holds that copy
+ELIGIBILITY_CUBE = os.getenv('ELIGIBILITY_CUBE', '0') == '1'
+
+# Largest shortlist the dashboard exports: Streamlit serves a download from memory, so
+# bigger exports go through exporter.py, which streams to a file
+EXPORT_MAX_ROWS = int(os.getenv('EXPORT_MAX_ROWS', '50000'))
+
+# Query performance panel at the bottom of the page (also shown with ?admin=1)
+QUERY_ADMIN = os.getenv('QUERY_ADMIN', '0') == '1'
+
+
+# Display-only formatting; the DataFrames keep numeric dtypes
+ELIGIBLE_COLUMN_CONFIG = {
+    'Avg Soft Skills': st.column_config.NumberColumn(format='%.2f'),
+    'Placement Package': st.column_config.NumberColumn(format='dollar'),
+    'Placement Date': st.column_config.DateColumn(format='YYYY-MM-DD'),
+}
+
+
+# Shortlist grouping choices: label -> ranking.GROUP_COLUMNS name
+RANK_GROUPS = {'Overall': None, 'Course Batch': 'course_batch', 'Company': 'company_name'}
+
+
+class InsightView(NamedTuple):
+    """A built insight section: its chart and, for top-N charts, the full table"""
+    figure: object
+    table: Optional[pd.DataFrame] = None
+
 
 class PlacementDashboard:
     
     def __init__(self):
         # Initialize database and generate data
         self.db = DatabaseManager()
-        self.db.create_tables()
-
-    def store_data(self):
-        # Clear existing data to ensure no NULL values
-        self.db.connect()
-        self.db.cursor.execute("DELETE FROM placements")
-        self.db.cursor.execute("DELETE FROM soft_skills")
-        self.db.cursor.execute("DELETE FROM programming")
-        self.db.cursor.execute("DELETE FROM students")
-        self.db.conn.commit()
-
-        # Populate with fresh data
-        generator = DataGenerator(100)
-        self.db.insert_data('students', generator.generate_students())
-        self.db.insert_data('programming', generator.generate_programming())
-        self.db.insert_data('soft_skills', generator.generate_soft_skills())
-        self.db.insert_data('placements', generator.generate_placements())
-        self.db.close()
+        # DDL and migrations run on the first rerun in each process, not on every rerun
+        self.db.ensure_schema()
+        # Pick up delta ingests committed by other processes since the last rerun
+        self.db.sync_changes()
+        # Per-phase timings of this rerun, shown as a waterfall at the bottom of the page
+        self.profile = RenderProfiler(RENDER_PROFILE or st.query_params.get('profile') == '1', RENDER_PROFILE_DIR)
+        self.profile.start()
+
+    def store_data(self, force: bool = False):
+        # Seed once; later reruns find the version marker and skip the rewrite.
+        # Use `python seed.py --force` to regenerate the data explicitly.
+        seed_database(self.db, force=force)
 
     def setup_ui(self):
         # Streamlit app
         st.title("Placement Eligibility Dashboard")
 
         # Sidebar for eligibility criteria
+        with self.profile.section("Sidebar"):
+            self.sidebar()
+
+    def sidebar(self):
         st.sidebar.header("Eligibility Criteria")
+        # Each slider is followed by a placeholder for its live count
+        counts = []
         self.min_problems = st.sidebar.slider("Minimum Problems Solved", 0, 100, 50)
+        counts.append(st.sidebar.empty())
         self.min_soft_skills = st.sidebar.slider("Minimum Soft Skills Score", 0, 100, 75)
+        counts.append(st.sidebar.empty())
         self.min_mock_score = st.sidebar.slider("Minimum Mock Interview Score", 0, 100, 70)
+        counts.append(st.sidebar.empty())
         self.min_assessments = st.sidebar.slider("Minimum Assessments Completed", 0, 20, 5)
+        counts.append(st.sidebar.empty())
         self.min_mini_projects = st.sidebar.slider("Minimum Mini Projects", 0, 5, 1)
-        self.batch_filter = st.sidebar.multiselect("Course Batch", ['DS_2023', 'DS_2024', 'DS_2025'], default=['DS_2023', 'DS_2024', 'DS_2025'])
+        counts.append(st.sidebar.empty())
+        self.batch_filter = st.sidebar.multiselect("Course Batch", BATCHES, default=BATCHES)
+        self.profile.lap('widgets')
+        if ELIGIBILITY_CUBE:
+            self.slider_counts(counts)
+            self.profile.lap('cube')
+
+    def slider_counts(self, placeholders):
+        # Cube lookups: the current count, and the count with each filter relaxed to 0
+        cube = get_eligibility_cube()
+        criteria = self.criteria()
+        count = cube.exact_count(criteria)
+        for placeholder, (field, _) in zip(placeholders, CUBE_DIMENSIONS):
+            relaxed = cube.exact_count(criteria._replace(**{field: 0}))
+            placeholder.caption(f"{count:,} qualify · {relaxed:,} without this filter")
+
+        # Suggestion mode: how far each slider can go while keeping a target shortlist size
+        with st.sidebar.expander("Suggest thresholds"):
+            target = st.number_input("Target shortlist size", min_value=1, value=max(1, count))
+            labels = ["Problems Solved", "Soft Skills Score", "Mock Interview Score",
+                      "Assessments Completed", "Mini Projects"]
+            suggestions = cube.suggest(criteria, int(target))
+            for label, (field, _) in zip(labels, CUBE_DIMENSIONS):
+                value = suggestions[field]
+                st.caption(f"{label}: at most {value}" if value is not None
+                           else f"{label}: not reachable with the other filters")
+
+    def criteria(self) -> EligibilityCriteria:
+        return EligibilityCriteria(self.min_problems, self.min_soft_skills, self.min_mock_score,
+                                   self.min_assessments, self.min_mini_projects, tuple(self.batch_filter))
 
     def eligible_students(self):
+        with self.profile.section("Eligible Students"):
+            self.eligible_students_table()
+
+    def eligible_students_table(self):
         # Query for eligible students
-        self.db.connect()
-        query = '''
-            SELECT s.name, s.email, s.course_batch, p.problems_solved, 
-                (ss.communication + ss.teamwork + ss.presentation)/3 as avg_soft_skills,
-                pl.mock_interview_score,
-                pl.company_name,
-                pl.placement_package,
-                DATE_FORMAT(pl.placement_date, '%Y-%m-%d') as placement_date,
-                p.assessments_completed,
-                p.mini_projects
-            FROM students s
-            JOIN programming p ON s.student_id = p.student_id
-            JOIN soft_skills ss ON s.student_id = ss.student_id
-            JOIN placements pl ON s.student_id = pl.student_id
-            WHERE p.problems_solved >= %s 
-            AND (ss.communication + ss.teamwork + ss.presentation)/3 >= %s
-            AND pl.mock_interview_score >= %s
-            AND p.assessments_completed >= %s
-            AND p.mini_projects >= %s
-        '''
-        params = [self.min_problems, self.min_soft_skills, self.min_mock_score, self.min_assessments, self.min_mini_projects]
-
-        # Handle the IN clause dynamically
-        if self.batch_filter:
-            query += ' AND s.course_batch IN ({})'.format(','.join(['%s'] * len(self.batch_filter)))
-            params.extend(self.batch_filter)
-        else:
-            query += ' AND 1=0'  # No results if no batches selected
+        criteria = self.criteria()
 
         # Display eligible students
         st.header("Eligible Students")
-        results = self.db.execute_query(query, tuple(params))
-        df = pd.DataFrame(results, columns=['Name', 'Email', 'Batch', 'Problems Solved', 
-                                        'Avg Soft Skills', 'Mock Interview Score',
-                                        'Company Name', 'Placement Package', 'Placement Date',
-                                        'Assessments Completed', 'Mini Projects'])
-        # Format numeric columns, handling potential None values as a fallback
-        df['Avg Soft Skills'] = df['Avg Soft Skills'].astype(float)
-        df['Avg Soft Skills'] = df['Avg Soft Skills'].round(2)
-        df['Placement Package'] = df['Placement Package'].apply(lambda x: f"${x:,.2f}" if x is not None else 'N/A')
-        df['Company Name'] = df['Company Name'].fillna('N/A')
-        df['Placement Date'] = df['Placement Date'].fillna('N/A')
-        st.dataframe(df)
+        sort_col, order_col, size_col = st.columns(3)
+        sort_column = sort_col.selectbox("Sort by", list(SORT_COLUMNS))
+        descending = order_col.selectbox("Order", ['Ascending', 'Descending']) == 'Descending'
+        page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1)
+        self.profile.lap('widgets')
+
+        # Keyset cursors of the pages visited so far; reset when the filter or sort changes
+        view = (criteria, sort_column, descending, page_size)
+        if st.session_state.get('eligible_view') != view:
+            st.session_state.eligible_view = view
+            st.session_state.eligible_cursors = [None]
+        cursors = st.session_state.eligible_cursors
+        page = len(cursors) - 1
+
+        # One checkout for the count and the page, returned before any widget can rerun the script
+        with self.db.session():
+            # Total for the pager; the columnar engine counts without a round trip
+            if ELIGIBILITY_ENGINE == 'columnar':
+                total = get_eligibility_engine().count(criteria)
+            else:
+                total = self.db.execute_query(*build_count_query(criteria))[0][0]
+            self.profile.lap('sql')
+            # Only the visible page is fetched and materialized
+            results = self.db.execute_query(*build_page_query(criteria, sort_column, descending, page_size,
+                                                              cursors[-1]))
+        next_cursor = results[-1][-2:] if results else None
+        self.profile.lap('sql')
+        # Typed columns (the trailing keyset columns are dropped); formatting happens in the column config
+        df = to_frame(results, ELIGIBLE_COLUMNS, ELIGIBLE_DTYPES)
+        df['Company Name'] = df['Company Name'].cat.add_categories(['N/A']).fillna('N/A')
+        self.profile.lap('pandas')
+        st.dataframe(df, column_config=ELIGIBLE_COLUMN_CONFIG)
+        self.profile.lap('table')
+
+        prev_col, info_col, next_col = st.columns([1, 3, 1])
+        pages = max(1, -(-total // page_size))
+        info_col.caption(f"Page {page + 1} of {pages} · {total} eligible students")
+        if prev_col.button("Previous", disabled=page == 0):
+            cursors.pop()
+            st.rerun()
+        if next_col.button("Next", disabled=(page + 1) * page_size >= total or next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+        # Export streams the eligible rows to a temp file, never through a DataFrame, but the
+        # download itself is held in memory, so it is capped at EXPORT_MAX_ROWS. Nothing is kept
+        # between reruns: the button is redrawn with the current criteria on every rerun and the
+        # export only runs when it is clicked
+        with st.expander("Export shortlist"):
+            if total > EXPORT_MAX_ROWS:
+                st.caption(f"{total} students is more than the dashboard exports ({EXPORT_MAX_ROWS}). "
+                           "Narrow the filters, or run `python exporter.py` to stream the full shortlist "
+                           "to a file.")
+            else:
+                fmt = st.radio("Format", FORMATS, horizontal=True)
+                st.download_button(f"Download {total} students ({fmt})", self.export_download(criteria, fmt),
+                                   file_name=f'eligible_students.{fmt}', on_click='ignore')
+        self.profile.lap('widgets')
+
+    def export_download(self, criteria: EligibilityCriteria, fmt: str):
+        """Deferred download data of at most EXPORT_MAX_ROWS rows; the temp file is unlinked
+        as soon as its bytes are read"""
+        def generate() -> bytes:
+            with tempfile.TemporaryFile(suffix=f'.{fmt}') as out:
+                export_eligible(self.db, criteria, out, fmt, max_rows=EXPORT_MAX_ROWS)
+                out.seek(0)
+                return out.read()
+        return generate
+
+    def ranked_shortlist(self):
+        with self.profile.section("Ranked Shortlist"):
+            self.ranked_shortlist_table()
+
+    def ranked_shortlist_table(self):
+        # Weighted composite score; the top K is a partial selection, the cohort is never fully sorted
+        st.header("Ranked Shortlist")
+        k_col, group_col, eligible_col = st.columns(3)
+        k = int(k_col.number_input("Top K", min_value=1, max_value=500, value=10))
+        group_by = RANK_GROUPS[group_col.selectbox("Top K per", list(RANK_GROUPS))]
+        eligible_only = eligible_col.checkbox("Only eligible students", value=True)
+        with st.expander("Scoring weights"):
+            weight_cols = st.columns(2)
+            weights = {name: weight_cols[i % 2].slider(name.replace('_', ' ').title(), 0.0, 5.0,
+                                                       float(DEFAULT_WEIGHTS.get(name, 0.0)), 0.5,
+                                                       key=f'weight_{name}')
+                       for i, name in enumerate(METRIC_NAMES)}
+        self.profile.lap('widgets')
+        if not any(weights.values()):
+            st.warning("Give at least one metric a weight above zero.")
+            return
+
+        student_ids = None
+        if eligible_only:
+            criteria = self.criteria()
+            if ELIGIBILITY_ENGINE == 'columnar':
+                student_ids = get_eligibility_engine().eligible_ids(criteria)
+            else:
+                where, params = eligibility_where(criteria)
+                student_ids = [row[0] for row in self.db.execute_query('SELECT s.student_id' + ELIGIBLE_FROM + where,
+                                                                       tuple(params))]
+            self.profile.lap('sql')
+        model = get_ranking_model()
+        ranked = model.rank(weights, k, group_by, student_ids)
+        self.profile.lap('rank')
+
+        ids = [entry.student_id for entry in ranked]
+        people = StudentDirectory(self.db).lookup(ids)
+        metrics = model.metric_rows(ids)
+        shown = [name for name in METRIC_NAMES if weights[name]]
+        rows = [(entry.group, entry.rank) + people.get(entry.student_id, (None, None)) +
+                (entry.score,) + tuple(metrics[entry.student_id][name] for name in shown) for entry in ranked]
+        df = to_frame(rows, ['Group', 'Rank', 'Name', 'Email', 'Score'] +
+                      [name.replace('_', ' ').title() for name in shown],
+                      ['category', 'int16', 'object', 'object', 'float64'] + ['int16'] * len(shown))
+        if group_by is None:
+            df = df.drop(columns='Group')
+        self.profile.lap('pandas')
+        st.dataframe(df, hide_index=True, column_config={'Score': st.column_config.NumberColumn(format='%.2f')})
+        self.profile.lap('table')
+
+    # (result key, subheader, render method) in display order
+    INSIGHT_SECTIONS = [
+        ('avg_problems_by_batch', "Average Problems Solved by Batch", 'insight_avg_problems_by_batch'),
+        ('ready_students', "Students Ready for Placement", 'insight_ready_students'),
+        ('communication_distribution', "Communication Skills Distribution", 'insight_communication_distribution'),
+        ('multiple_internships', "Students with Multiple Internships", 'insight_multiple_internships'),
+        ('avg_package_by_city', "Average Placement Package by City", 'insight_avg_package_by_city'),
+        ('high_soft_skills', "Students with High Soft Skills Scores", 'insight_high_soft_skills'),
+        ('language_preference', "Programming Language Preference", 'insight_language_preference'),
+        ('success_rate_by_batch', "Placement Success Rate by Batch", 'insight_success_rate_by_batch'),
+        ('certified_students', "Students with Certifications", 'insight_certified_students'),
+        ('recent_placements', "Recent Placements by Company", 'insight_recent_placements'),
+    ]
 
     def diplaying_insights(self):
         # Display insights
         st.header("Placement Insights")
-
+        # Sections are collapsed by default and only an open one runs its query and builds its
+        # figure; built sections are reused until a table they read is written
+        memo = get_insight_memo()
+        sections, pending = [], []
+        for number, (key, title, render) in enumerate(self.INSIGHT_SECTIONS, 1):
+            expander = st.expander(f"{number}. {title}", key=f'insight_{key}', on_change='rerun')
+            version = view = None
+            if expander.open:
+                # Taken before the query runs, so a write during it leaves the section stale-keyed
+                version = insight_version(self.db, key)
+                view = memo.get(key, version)
+                if view is None:
+                    pending.append(key)
+            sections.append((key, f"{number}. {title}", render, expander, version, view))
+        self.profile.lap('widgets')
+
+        # The open sections' queries run concurrently; a failed one only blanks its own section
+        fetch_started = time.perf_counter()
+        insights = fetch_insights(self.db, keys=pending)
+        if pending:
+            self.profile.record("Insight queries", 'sql', fetch_started, time.perf_counter() - fetch_started)
+        for key, section, render, expander, version, view in sections:
+            if not expander.open:
+                continue
+            with self.profile.section(section), expander:
+                if view is None:
+                    result = insights[key]
+                    # Each query's own time inside the concurrent fetch (zero when served from the cache)
+                    self.profile.record(section, 'sql', fetch_started, result.seconds)
+                    if result.error is not None:
+                        st.error(f"Could not load this insight: {result.error}")
+                        continue
+                    view = getattr(self, render)(result.rows)
+                    memo.put(key, version, view)
+                self.show_insight(view)
+
+    def show_insight(self, view: 'InsightView'):
+        if view.figure is not None:
+            st.plotly_chart(view.figure)
+            self.profile.lap('chart')
+        if view.table is not None:
+            # DataFrame: All records
+            st.dataframe(view.table)
+            self.profile.lap('table')
+
+    def insight_avg_problems_by_batch(self, rows) -> 'InsightView':
         # Query 1: Average programming performance by batch
-        st.subheader("1. Average Problems Solved by Batch")
-        batch_data = self.db.execute_query("SELECT course_batch, AVG(problems_solved) FROM students s JOIN programming p ON s.student_id = p.student_id GROUP BY course_batch")
-        batch_df = pd.DataFrame(batch_data, columns=['Batch', 'Avg Problems Solved'])
-        batch_df['Avg Problems Solved'] = batch_df['Avg Problems Solved'].astype(float)
+        import plotly.express as px
+        batch_df = to_frame(rows, ['Batch', 'Avg Problems Solved'], ['category', 'float64'])
         batch_df['Avg Problems Solved'] = batch_df['Avg Problems Solved'].round(2)
+        self.profile.lap('pandas')
         fig = px.bar(batch_df, x='Batch', y='Avg Problems Solved', title="Average Problems Solved by Batch")
-        st.plotly_chart(fig)
+        self.profile.lap('figure')
+        return InsightView(fig)
 
+    def insight_ready_students(self, rows) -> 'InsightView':
         # Query 2: Students ready for placement
-        st.subheader("2. Students Ready for Placement")
-        # Fetch all records for DataFrame
-        top_students_data_all = self.db.execute_query('''
-        SELECT s.name, p.latest_project_score, pl.mock_interview_score
-        FROM students s
-        JOIN programming p ON s.student_id = p.student_id
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.placement_status = 'Ready'
-        ORDER BY p.latest_project_score DESC, pl.mock_interview_score DESC
-        ''')
-        top_students_df_all = pd.DataFrame(top_students_data_all, columns=['Name', 'Latest Project Score', 'Mock Interview Score'])
-        # Fetch top 5 for visualization
-        top_students_data_top5 = self.db.execute_query('''
-        SELECT s.name, p.latest_project_score, pl.mock_interview_score
-        FROM students s
-        JOIN programming p ON s.student_id = p.student_id
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.placement_status = 'Ready'
-        ORDER BY p.latest_project_score DESC, pl.mock_interview_score DESC
-        LIMIT 5
-        ''')
-        top_students_df_top5 = pd.DataFrame(top_students_data_top5, columns=['Name', 'Latest Project Score', 'Mock Interview Score'])
+        import plotly.graph_objects as go
+        top_students_df_all = to_frame(rows, ['Name', 'Latest Project Score', 'Mock Interview Score'],
+                                       ['object', 'int16', 'int16'])
+        top_students_df_top5 = top_students_df_all.head(TOP_N)
+        self.profile.lap('pandas')
         # Visualization: Grouped bar chart for top 5
         fig = go.Figure(data=[
         go.Bar(name='Latest Project Score', x=top_students_df_top5['Name'], y=top_students_df_top5['Latest Project Score']),
         go.Bar(name='Mock Interview Score', x=top_students_df_top5['Name'], y=top_students_df_top5['Mock Interview Score'])
         ])
         fig.update_layout(barmode='group', title="Top 5 Students Ready for Placement", xaxis_title="Student Name", yaxis_title="Score")
-        st.plotly_chart(fig)
-        # DataFrame: All records
-        st.dataframe(top_students_df_all)
+        self.profile.lap('figure')
+        return InsightView(fig, top_students_df_all)
 
+    def insight_communication_distribution(self, rows) -> 'InsightView':
         # Query 3: Soft skills distribution
-        st.subheader("3. Communication Skills Distribution")
-        skills_data = self.db.execute_query('''
-        SELECT CASE 
-            WHEN communication >= 90 THEN '90-100'
-            WHEN communication >= 80 THEN '80-89'
-            WHEN communication >= 70 THEN '70-79'
-            ELSE 'Below 70'
-        END as score_range, COUNT(*) as count
-        FROM soft_skills
-        GROUP BY score_range
-        ''')
-        skills_df = pd.DataFrame(skills_data, columns=['Score Range', 'Count'])
+        import plotly.express as px
+        skills_df = to_frame(rows, ['Score Range', 'Count'], ['category', 'int64'])
+        self.profile.lap('pandas')
         fig = px.pie(skills_df, names='Score Range', values='Count', title="Communication Skills Distribution")
-        st.plotly_chart(fig)
+        self.profile.lap('figure')
+        return InsightView(fig)
 
+    def insight_multiple_internships(self, rows) -> 'InsightView':
         # Query 4: Students with multiple internships
-        st.subheader("4. Students with Multiple Internships")
-        # Fetch all records for DataFrame
-        internships_data_all = self.db.execute_query('''
-        SELECT s.name, pl.internships_completed
-        FROM students s
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.internships_completed > 1
-        ORDER BY pl.internships_completed DESC
-        ''')
-        internships_df_all = pd.DataFrame(internships_data_all, columns=['Name', 'Internships Completed'])
-        # Fetch top 5 for visualization
-        internships_data_top5 = self.db.execute_query('''
-        SELECT s.name, pl.internships_completed
-        FROM students s
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.internships_completed > 1
-        ORDER BY pl.internships_completed DESC
-        LIMIT 5
-        ''')
-        internships_df_top5 = pd.DataFrame(internships_data_top5, columns=['Name', 'Internships Completed'])
+        import plotly.express as px
+        internships_df_all = to_frame(rows, ['Name', 'Internships Completed'], ['object', 'int16'])
+        internships_df_top5 = internships_df_all.head(TOP_N)
+        self.profile.lap('pandas')
         # Visualization: Bar chart for top 5
         fig = px.bar(internships_df_top5, x='Name', y='Internships Completed', title="Top 5 Students with Multiple Internships")
-        st.plotly_chart(fig)
-        # DataFrame: All records
-        st.dataframe(internships_df_all)
+        self.profile.lap('figure')
+        return InsightView(fig, internships_df_all)
 
+    def insight_avg_package_by_city(self, rows) -> 'InsightView':
         # Query 5: Average placement package by city
-        st.subheader("5. Average Placement Package by City")
-        package_data = self.db.execute_query('''
-        SELECT s.city, AVG(pl.placement_package) as avg_package
-        FROM students s
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.placement_status = 'Placed'
-        GROUP BY s.city
-        ''')
-        package_df = pd.DataFrame(package_data, columns=['City', 'Average Package'])
-        package_df['Average Package'] = package_df['Average Package'].apply(lambda x: f"${x:,.2f}")
+        import plotly.express as px
+        # The package stays numeric so the axis scales by value; only the labels are formatted
+        package_df = to_frame(rows, ['City', 'Average Package'], ['category', 'float64'])
+        self.profile.lap('pandas')
         fig = px.bar(package_df, x='City', y='Average Package', title="Average Placement Package by City")
-        st.plotly_chart(fig)
+        fig.update_yaxes(tickprefix='$', tickformat=',.2f')
+        fig.update_traces(hovertemplate='%{x}: $%{y:,.2f}<extra></extra>')
+        self.profile.lap('figure')
+        return InsightView(fig)
 
+    def insight_high_soft_skills(self, rows) -> 'InsightView':
         # Query 6: Students with high soft skills scores
-        st.subheader("6. Students with High Soft Skills Scores")
-        # Fetch all records for DataFrame
-        high_soft_skills_data_all = self.db.execute_query('''
-        SELECT s.name, AVG(ss.communication + ss.teamwork + ss.presentation) as avg_soft_skills
-        FROM students s
-        JOIN soft_skills ss ON s.student_id = ss.student_id
-        GROUP BY s.student_id, s.name
-        HAVING avg_soft_skills > 85
-        ORDER BY avg_soft_skills DESC
-        ''')
-        high_soft_skills_df_all = pd.DataFrame(high_soft_skills_data_all, columns=['Name', 'Avg Soft Skills'])
-        high_soft_skills_df_all['Avg Soft Skills'] = high_soft_skills_df_all['Avg Soft Skills'].astype(float)
+        import plotly.express as px
+        high_soft_skills_df_all = to_frame(rows, ['Name', 'Avg Soft Skills'], ['object', 'float64'])
         high_soft_skills_df_all['Avg Soft Skills'] = high_soft_skills_df_all['Avg Soft Skills'].round(2)
-        # Fetch top 5 for visualization
-        high_soft_skills_data_top5 = self.db.execute_query('''
-        SELECT s.name, AVG(ss.communication + ss.teamwork + ss.presentation) as avg_soft_skills
-        FROM students s
-        JOIN soft_skills ss ON s.student_id = ss.student_id
-        GROUP BY s.student_id, s.name
-        HAVING avg_soft_skills > 85
-        ORDER BY avg_soft_skills DESC
-        LIMIT 5
-        ''')
-        high_soft_skills_df_top5 = pd.DataFrame(high_soft_skills_data_top5, columns=['Name', 'Avg Soft Skills'])
-        high_soft_skills_df_top5['Avg Soft Skills'] = high_soft_skills_df_top5['Avg Soft Skills'].astype(float)
-        high_soft_skills_df_top5['Avg Soft Skills'] = high_soft_skills_df_top5['Avg Soft Skills'].round(2)
+        high_soft_skills_df_top5 = high_soft_skills_df_all.head(TOP_N)
+        self.profile.lap('pandas')
         # Visualization: Bar chart for top 5
         fig = px.bar(high_soft_skills_df_top5, x='Name', y='Avg Soft Skills', title="Top 5 Students with High Soft Skills Scores")
-        st.plotly_chart(fig)
-        # DataFrame: All records
-        st.dataframe(high_soft_skills_df_all)
+        self.profile.lap('figure')
+        return InsightView(fig, high_soft_skills_df_all)
 
+    def insight_language_preference(self, rows) -> 'InsightView':
         # Query 7: Programming language preference
-        st.subheader("7. Programming Language Preference")
-        language_data = self.db.execute_query('''
-        SELECT p.language, COUNT(*) as student_count
-        FROM programming p
-        GROUP BY p.language
-        ''')
-        language_df = pd.DataFrame(language_data, columns=['Language', 'Student Count'])
+        import plotly.express as px
+        language_df = to_frame(rows, ['Language', 'Student Count'], ['category', 'int64'])
+        self.profile.lap('pandas')
         fig = px.bar(language_df, x='Language', y='Student Count', title="Programming Language Preference")
-        st.plotly_chart(fig)
+        self.profile.lap('figure')
+        return InsightView(fig)
 
+    def insight_success_rate_by_batch(self, rows) -> 'InsightView':
         # Query 8: Placement success rate by batch
-        st.subheader("8. Placement Success Rate by Batch")
-        success_rate_data = self.db.execute_query('''
-        SELECT s.course_batch, 
-                COUNT(CASE WHEN pl.placement_status = 'Placed' THEN 1 END) * 100.0 / COUNT(*) as success_rate
-        FROM students s
-        JOIN placements pl ON s.student_id = pl.student_id
-        GROUP BY s.course_batch
-        ''')
-        success_rate_df = pd.DataFrame(success_rate_data, columns=['Batch', 'Success Rate'])
-        success_rate_df['Success Rate'] = success_rate_df['Success Rate'].astype(float)
+        import plotly.express as px
+        success_rate_df = to_frame(rows, ['Batch', 'Success Rate'], ['category', 'float64'])
         success_rate_df['Success Rate'] = success_rate_df['Success Rate'].round(2)
+        self.profile.lap('pandas')
         fig = px.bar(success_rate_df, x='Batch', y='Success Rate', title="Placement Success Rate by Batch")
-        st.plotly_chart(fig)
+        self.profile.lap('figure')
+        return InsightView(fig)
 
+    def insight_certified_students(self, rows) -> 'InsightView':
         # Query 9: Students with certifications
-        st.subheader("9. Students with Certifications")
-        # Fetch all records for DataFrame
-        certifications_data_all = self.db.execute_query('''
-        SELECT s.name, p.certifications_earned
-        FROM students s
-        JOIN programming p ON s.student_id = p.student_id
-        WHERE p.certifications_earned > 0
-        ORDER BY p.certifications_earned DESC
-        ''')
-        certifications_df_all = pd.DataFrame(certifications_data_all, columns=['Name', 'Certifications Earned'])
-        # Fetch top 5 for visualization
-        certifications_data_top5 = self.db.execute_query('''
-        SELECT s.name, p.certifications_earned
-        FROM students s
-        JOIN programming p ON s.student_id = p.student_id
-        WHERE p.certifications_earned > 0
-        ORDER BY p.certifications_earned DESC
-        LIMIT 5
-        ''')
-        certifications_df_top5 = pd.DataFrame(certifications_data_top5, columns=['Name', 'Certifications Earned'])
+        import plotly.express as px
+        certifications_df_all = to_frame(rows, ['Name', 'Certifications Earned'], ['object', 'int16'])
+        certifications_df_top5 = certifications_df_all.head(TOP_N)
+        self.profile.lap('pandas')
         # Visualization: Bar chart for top 5
         fig = px.bar(certifications_df_top5, x='Name', y='Certifications Earned', title="Top 5 Students with Certifications")
-        st.plotly_chart(fig)
-        # DataFrame: All records
-        st.dataframe(certifications_df_all)
+        self.profile.lap('figure')
+        return InsightView(fig, certifications_df_all)
 
+    def insight_recent_placements(self, rows) -> 'InsightView':
         # Query 10: Recent placements
-        st.subheader("10. Recent Placements by Company")
-        recent_placements_data = self.db.execute_query('''
-        SELECT pl.company_name, COUNT(*) as placement_count
-        FROM students s
-        JOIN placements pl ON s.student_id = pl.student_id
-        WHERE pl.placement_status = 'Placed'
-        GROUP BY pl.company_name
-        ORDER BY MAX(pl.placement_date) DESC
-        LIMIT 10
-        ''')
-        recent_placements_df = pd.DataFrame(recent_placements_data, columns=['Company Name', 'Placement Count'])
+        import plotly.express as px
+        recent_placements_df = to_frame(rows, ['Company Name', 'Placement Count'], ['category', 'int64'])
+        self.profile.lap('pandas')
         fig = px.bar(recent_placements_df, x='Company Name', y='Placement Count', title="Recent Placements by Company")
+        self.profile.lap('figure')
+        return InsightView(fig)
+
+    def query_admin(self):
+        # Slowest query fingerprints and the slow-query log since this process started
+        stats = get_query_stats()
+        st.header("Query Performance")
+        snapshot = stats.snapshot()
+        if not snapshot:
+            st.info("No queries recorded yet.")
+            return
+        st.dataframe(pd.DataFrame([{
+            'Query': row['fingerprint'], 'Calls': row['calls'], 'p50 ms': row['p50'] * 1000,
+            'p95 ms': row['p95'] * 1000, 'p99 ms': row['p99'] * 1000, 'Max ms': row['max_seconds'] * 1000,
+            'Rows': row['rows'], 'KiB': row['bytes'] / 1024, 'Errors': row['errors'], 'Slow': row['slow'],
+        } for row in snapshot]), hide_index=True)
+
+        if self.db.shared is not None:
+            shared = self.db.shared.stats()
+            st.caption(f"Shared cache: {shared['hits']} hits · {shared['misses']} misses · "
+                       f"{shared['waits']} waited for another worker · {shared['errors']} errors")
+
+        slow_queries = stats.slow_queries()
+        st.subheader(f"Slow Queries (over {stats.slow_seconds:g}s)")
+        if not slow_queries:
+            st.caption("None logged.")
+        for slow in slow_queries[:20]:
+            with st.expander(f"{slow.seconds * 1000:.0f} ms · {slow.rows:,} rows · {slow.fingerprint[:100]}"):
+                st.code(slow.query, language='sql')
+                if slow.plan:
+                    st.dataframe(pd.DataFrame(slow.plan), hide_index=True)
+        st.download_button("Download Prometheus metrics", stats.prometheus_text(), file_name='metrics.txt',
+                           mime='text/plain')
+
+    def profile_waterfall(self):
+        # Where this rerun's time went, one bar per phase in start order
+        if not self.profile.enabled:
+            return
+        import plotly.express as px
+        total = self.profile.total_seconds()
+        cprofile_report = self.profile.finish()
+        st.header("Render Profile")
+        phases = pd.DataFrame(self.profile.phases, columns=['Section', 'Phase', 'Start', 'Seconds'])
+        phases['Start ms'] = phases['Start'] * 1000
+        phases['Duration ms'] = phases['Seconds'] * 1000
+        phases['Step'] = [f"{section} · {phase}" for section, phase in zip(phases['Section'], phases['Phase'])]
+        st.caption(f"Script time {total * 1000:.0f} ms")
+        fig = px.bar(phases, x='Duration ms', y='Step', base='Start ms', color='Phase', orientation='h',
+                     title="Rerun Waterfall", height=max(300, 22 * len(phases)))
+        fig.update_yaxes(autorange='reversed', categoryorder='array', categoryarray=list(phases['Step']))
         st.plotly_chart(fig)
+        st.dataframe(phases.pivot_table(index='Section', columns='Phase', values='Duration ms', aggfunc='sum',
+                                        sort=False).round(1))
+        if cprofile_report is not None:
+            with st.expander(f"cProfile (saved to {self.profile.dump_path})"):
+                st.code(cprofile_report)
 
-        self.db.close()
-        
 dashboard = PlacementDashboard()
 dashboard.store_data()
 dashboard.setup_ui()
 dashboard.eligible_students()
-dashboard.diplaying_insights()
\ No newline at end of file
+dashboard.ranked_shortlist()
+dashboard.diplaying_insights()
+if QUERY_ADMIN or st.query_params.get('admin') == '1':
+    dashboard.query_admin()
+dashboard.profile_waterfall()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""Compare eligibility-query latency across storage backends.
+
+Seeds a fresh SQLite and DuckDB database with the same deterministic cohort,
+writes a Parquet snapshot of the DuckDB copy, then times the eligibility query
+for a fixed sequence of random slider settings on each backend (query cache
+bypassed). MySQL is included when requested and reachable:
+
+    python backend_benchmark.py --records 100000
+    python backend_benchmark.py --records 1000000 --backends duckdb duckdb-parquet mysql
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict
+from backends import DuckDBBackend, MySQLBackend, SQLiteBackend, write_parquet_snapshot
+from benchmark import percentile
+from data_generator import BulkDataGenerator
+from database import DatabaseManager
+from eligibility import build_eligibility_query
+from eligibility_engine import random_criteria
+from seed import seed_database
+
+BACKENDS = ['sqlite', 'duckdb', 'duckdb-parquet', 'mysql']
+
+
+def time_eligibility(db: DatabaseManager, runs: int, seed: int) -> Dict:
+    """Run the eligibility query for `runs` random criteria; latencies in milliseconds"""
+    rng = random.Random(seed)
+    samples, rows = [], 0
+    for _ in range(runs):
+        query, params = build_eligibility_query(random_criteria(rng))
+        start = time.perf_counter()
+        rows += len(db.execute_query(query, params, use_cache=False))
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': percentile(samples, 50), 'p95_ms': percentile(samples, 95),
+            'mean_ms': statistics.mean(samples), 'avg_rows': rows / runs}
+
+
+def seeded(db: DatabaseManager, records: int, seed: int) -> DatabaseManager:
+    db.create_tables()
+    start = time.perf_counter()
+    if seed_database(db, records, generator=BulkDataGenerator(records, seed=seed), report=None):
+        print(f"  seeded {db.backend.name} in {time.perf_counter() - start:.1f}s")
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eligibility-query latency per backend")
+    parser.add_argument('--records', type=int, default=100_000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backends', nargs='*', choices=BACKENDS, default=BACKENDS[:3])
+    parser.add_argument('--workdir', help="where the embedded databases are kept (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='placement_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    duckdb_path = os.path.join(workdir, f'placement_{args.records}.duckdb')
+    parquet_dir = os.path.join(workdir, f'parquet_{args.records}')
+
+    results = {}
+    for name in args.backends:
+        print(f"{name}:")
+        if name == 'sqlite':
+            db = seeded(DatabaseManager(backend=SQLiteBackend(os.path.join(workdir, f'placement_{args.records}.db'))),
+                        args.records, args.seed)
+        elif name == 'duckdb':
+            db = seeded(DatabaseManager(backend=DuckDBBackend(duckdb_path)), args.records, args.seed)
+        elif name == 'duckdb-parquet':
+            if not os.path.isdir(parquet_dir):
+                source = seeded(DatabaseManager(backend=DuckDBBackend(duckdb_path)), args.records, args.seed)
+                write_parquet_snapshot(source, parquet_dir)
+            db = DatabaseManager(backend=DuckDBBackend(duckdb_path, parquet_dir))
+        else:
+            db = DatabaseManager()
+            try:
+                db = seeded(DatabaseManager(backend=MySQLBackend(db.config)), args.records, args.seed)
+            except Exception as exc:
+                print(f"  skipped: MySQL unavailable ({exc})")
+                continue
+        results[name] = time_eligibility(db, args.runs, args.seed)
+
+    print(f"\n{'backend':<16}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'avg rows':>12}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+              f"{result['mean_ms']:>10.1f}{result['avg_rows']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""Storage backends behind DatabaseManager.
+
+The application SQL is written in MySQL's dialect. MySQL connections are used
+as-is; SQLite and DuckDB connections are wrapped so every statement is
+translated on the way in (placeholders, DATE_FORMAT, INSERT IGNORE,
+ON DUPLICATE KEY UPDATE and the table DDL).
+
+Select a backend with DB_BACKEND=mysql|sqlite|duckdb. SQLite and DuckDB keep
+their data in DB_PATH; DuckDB can instead serve a read-only Parquet snapshot
+of the four tables from DB_PARQUET_DIR (see write_parquet_snapshot).
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from summaries import SUMMARY_TABLES
+
+_DATE_FORMAT = re.compile(r"DATE_FORMAT\(\s*([^,]+?)\s*,\s*'([^']*)'\s*\)", re.IGNORECASE)
+_GREATEST = re.compile(r'\bGREATEST\(', re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r'\bINSERT\s+IGNORE\b', re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_ON_CONFLICT = re.compile(r'\bON\s+CONFLICT\b', re.IGNORECASE)
+_VALUES_REF = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_AUTO_INCREMENT = re.compile(r'\bINT\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b', re.IGNORECASE)
+_GENERATED_DIVISOR = re.compile(r'(\bAS\s*\(\(.*?\)\s*/\s*)(\d+)(\)\s*STORED\b)', re.IGNORECASE)
+_STORED = re.compile(r'\)\s*STORED\b', re.IGNORECASE)
+_FOREIGN_KEY = re.compile(r',\s*FOREIGN\s+KEY\s*\([^)]*\)\s*REFERENCES\s+\w+\s*\([^)]*\)', re.IGNORECASE)
+# A single parameter row, optionally followed by an upsert clause
+_VALUES_ROW = re.compile(r'\bVALUES\s*\((\s*\?\s*,?)+\)(?=\s*(ON\s+CONFLICT\b.*)?$)', re.IGNORECASE | re.DOTALL)
+
+# Store dates as ISO text in SQLite so DATE_FORMAT/strftime and ordering work
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, datetime.isoformat)
+
+
+@lru_cache(maxsize=1024)
+def translate(sql: str, dialect: str) -> str:
+    """Rewrite MySQL-dialect SQL for sqlite or duckdb"""
+    if dialect == 'sqlite':
+        sql = _DATE_FORMAT.sub(r"strftime('\2', \1)", sql)
+        # Integer division in SQLite would truncate the soft-skills average
+        sql = _GENERATED_DIVISOR.sub(r'\g<1>\g<2>.0\g<3>', sql)
+        # SQLite's multi-argument max() is its GREATEST
+        sql = _GREATEST.sub('MAX(', sql)
+    else:
+        sql = _DATE_FORMAT.sub(r"strftime(\1, '\2')", sql)
+        # DuckDB only has virtual generated columns and limited FK support
+        sql = _STORED.sub(') VIRTUAL', sql)
+        sql = _FOREIGN_KEY.sub('', sql)
+    sql = _INSERT_IGNORE.sub('INSERT OR IGNORE', sql)
+    if _ON_DUPLICATE.search(sql):
+        sql = _ON_DUPLICATE.sub('ON CONFLICT DO UPDATE SET', sql)
+        sql = _VALUES_REF.sub(r'excluded.\1', sql)
+    elif _ON_CONFLICT.search(sql):
+        # Upserts built with Backend.upsert_clause keep MySQL's VALUES(column) references
+        sql = _VALUES_REF.sub(r'excluded.\1', sql)
+    sql = _AUTO_INCREMENT.sub('INTEGER PRIMARY KEY', sql)
+    return sql.replace('%s', '?')
+
+
+class TranslatingCursor:
+    """DB-API cursor that translates MySQL-dialect statements before running them"""
+
+    def __init__(self, cursor, dialect: str):
+        self._cursor = cursor
+        self._dialect = dialect
+
+    def execute(self, operation: str, params=()):
+        self._cursor.execute(translate(operation, self._dialect), tuple(params or ()))
+        return self
+
+    def executemany(self, operation: str, seq_of_params):
+        sql = translate(operation, self._dialect)
+        rows = [tuple(row) for row in seq_of_params]
+        if not rows:
+            # Matches mysql.connector, which treats an empty executemany as a no-op
+            return self
+        if self._dialect == 'duckdb' and _VALUES_ROW.search(sql):
+            # DuckDB binds parameters row by row; inserting from an Arrow batch is orders of magnitude faster
+            import pyarrow as pa
+            batch = pa.table({f'c{i}': list(column) for i, column in enumerate(zip(*rows))})
+            self._cursor.register('_insert_batch', batch)
+            try:
+                self._cursor.execute(_VALUES_ROW.sub('SELECT * FROM _insert_batch', sql))
+            finally:
+                self._cursor.unregister('_insert_batch')
+        else:
+            self._cursor.executemany(sql, rows)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return getattr(self._cursor, 'rowcount', -1)
+
+    def close(self):
+        if self._dialect == 'sqlite':
+            self._cursor.close()
+
+
+class TranslatingConnection:
+    """Connection wrapper handing out TranslatingCursors; cursor kwargs such as buffered= are ignored"""
+
+    def __init__(self, conn, dialect: str):
+        self._conn = conn
+        self._dialect = dialect
+
+    def cursor(self, **kwargs):
+        return TranslatingCursor(self._conn.cursor(), self._dialect)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        except Exception:
+            # DuckDB raises when no transaction is open
+            pass
+
+    @property
+    def in_transaction(self):
+        return getattr(self._conn, 'in_transaction', False)
+
+    def ping(self, **kwargs):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+class Backend:
+    """Connection factory plus dialect capabilities for one storage engine"""
+    name = ''
+    multi_statements = False   # several statements per execute() round trip
+    local_infile = False       # LOAD DATA LOCAL INFILE
+    read_only = False
+    explain_prefix = 'EXPLAIN '
+
+    def connect(self):
+        raise NotImplementedError
+
+    def ping(self, conn):
+        """Revive an idle pooled connection"""
+
+    def set_statement_timeout(self, cursor, seconds: Optional[float]):
+        """Limit how long the server runs each following SELECT on this connection (None/0 = no limit)"""
+
+    def upsert_clause(self, key: str) -> str:
+        """Clause turning an INSERT into an upsert on the unique column `key`; the
+        assignments that follow use MySQL's `column = VALUES(column)` form"""
+        return 'ON DUPLICATE KEY UPDATE'
+
+    @property
+    def key(self) -> Tuple:
+        """Identity used to share one connection pool per database"""
+        raise NotImplementedError
+
+
+class MySQLBackend(Backend):
+    name = 'mysql'
+    multi_statements = True
+    local_infile = True
+
+    def __init__(self, config: Dict):
+        self.config = config
+
+    def connect(self):
+        # Deferred so SQLite/DuckDB processes never load the connector
+        import mysql.connector
+        return mysql.connector.connect(**self.config)
+
+    def ping(self, conn):
+        conn.ping(reconnect=True, attempts=1)
+
+    def set_statement_timeout(self, cursor, seconds: Optional[float]):
+        cursor.execute('SET SESSION max_execution_time = %s', (int(seconds * 1000) if seconds else 0,))
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name,) + tuple(sorted(self.config.items()))
+
+
+class SQLiteBackend(Backend):
+    name = 'sqlite'
+    # Plain EXPLAIN in SQLite lists VM opcodes
+    explain_prefix = 'EXPLAIN QUERY PLAN '
+
+    def __init__(self, path: str = 'placement.db'):
+        self.path = path
+
+    def upsert_clause(self, key: str) -> str:
+        return f'ON CONFLICT ({key}) DO UPDATE SET'
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA foreign_keys = ON')
+        return TranslatingConnection(conn, self.name)
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name, os.path.abspath(self.path))
+
+
+class DuckDBBackend(Backend):
+    name = 'duckdb'
+
+    def __init__(self, path: str = 'placement.duckdb', parquet_dir: Optional[str] = None):
+        self.path = path
+        self.parquet_dir = parquet_dir
+        self.read_only = parquet_dir is not None
+        self._database = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        import duckdb
+        if self.parquet_dir is None:
+            return duckdb.connect(self.path)
+        # Columnar scans straight over the snapshot files
+        database = duckdb.connect(':memory:')
+        for table in SNAPSHOT_TABLES:
+            path = os.path.join(self.parquet_dir, f'{table}.parquet').replace("'", "''")
+            database.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
+        return database
+
+    def upsert_clause(self, key: str) -> str:
+        # A target is required once a table has more than one unique constraint
+        return f'ON CONFLICT ({key}) DO UPDATE SET'
+
+    def connect(self):
+        # One database instance per process; each pooled connection is a cursor on it
+        with self._lock:
+            if self._database is None:
+                self._database = self._open()
+        return TranslatingConnection(self._database.cursor(), self.name)
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name, os.path.abspath(self.path), self.parquet_dir)
+
+
+# Tables included in a Parquet snapshot (app_meta carries the seed marker)
+SNAPSHOT_TABLES = ['students', 'programming', 'soft_skills', 'placements', 'app_meta'] + SUMMARY_TABLES
+
+
+def get_backend(config: Dict) -> Backend:
+    """Backend selected by DB_BACKEND (default mysql)"""
+    name = os.getenv('DB_BACKEND', 'mysql').lower()
+    if name == 'mysql':
+        return MySQLBackend(config)
+    if name == 'sqlite':
+        return SQLiteBackend(os.getenv('DB_PATH', 'placement.db'))
+    if name == 'duckdb':
+        return DuckDBBackend(os.getenv('DB_PATH', 'placement.duckdb'), os.getenv('DB_PARQUET_DIR') or None)
+    raise ValueError(f"Unknown DB_BACKEND: {name}")
+
+
+def write_parquet_snapshot(db, directory: str, chunk_size: int = 50000):
+    """Write the four tables (plus app_meta and the summaries) of any backend to <directory>/<table>.parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    for table in SNAPSHOT_TABLES:
+        with db.connection() as conn:
+            cursor = conn.cursor(buffered=False)
+            try:
+                cursor.execute(f'SELECT * FROM {table}')
+                names = [column[0] for column in cursor.description]
+                writer = None
+                try:
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        batch = pa.RecordBatch.from_pylist([dict(zip(names, _arrow_values(row))) for row in rows])
+                        if writer is None:
+                            writer = pq.ParquetWriter(os.path.join(directory, f'{table}.parquet'), batch.schema)
+                        writer.write_batch(batch.cast(writer.schema))
+                    if writer is None:
+                        # Empty table: keep the columns so the snapshot views still resolve
+                        pq.write_table(pa.table({name: pa.array([], pa.null()) for name in names}),
+                                       os.path.join(directory, f'{table}.parquet'))
+                finally:
+                    if writer is not None:
+                        writer.close()
+            finally:
+                cursor.close()
+
+
+def _arrow_values(row: Tuple) -> Tuple:
+    # SQLite returns dates as ISO strings; Decimal averages become floats for a stable schema
+    return tuple(float(value) if isinstance(value, Decimal) else value for value in row)
+
+
+def main():
+    import argparse
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Write a Parquet snapshot of the configured database")
+    parser.add_argument('directory')
+    args = parser.parse_args()
+    write_parquet_snapshot(DatabaseManager(), args.directory)
+    print(f"Wrote {', '.join(SNAPSHOT_TABLES)} to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Benchmark suite: data generation, loading, eligibility filtering and insights.
+
+Each cohort size gets a fresh database (SQLite by default, so no MySQL server
+is needed) and is measured in phases:
+
+- generate: iterating every table's batches from the data generator
+- load: generating and inserting the cohort through load_dataset
+- eligibility / eligibility_page / eligibility_count: the Eligible Students
+  queries for a fixed sequence of random slider settings
+- insight:<name>: each of the ten insight queries
+
+Query phases bypass the result cache. Every phase reports p50/p95 latency,
+throughput and peak RSS. Results are written as JSON; with --baseline the run
+fails when any phase's p50 is more than --threshold slower than the stored run:
+
+    python benchmark.py --sizes 1000 100000 --output bench.json
+    python benchmark.py --sizes 1000 100000 --baseline bench.json --threshold 0.25
+    python benchmark.py --sizes 1000000 --backend duckdb
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from backends import DuckDBBackend, MySQLBackend, SQLiteBackend
+from data_generator import BulkDataGenerator, DataGenerator
+from database import DATA_TABLES, DatabaseManager
+from eligibility import SORT_COLUMNS, build_count_query, build_eligibility_query, build_page_query
+from eligibility_engine import random_criteria
+from insights import INSIGHT_QUERIES
+from loader import load_dataset
+
+# Phases whose p50 is below this many milliseconds are too noisy to flag as regressions
+MIN_REGRESSION_MS = 1.0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _reset_peak_rss():
+    # Linux resets the VmHWM high-water mark when 5 is written to clear_refs
+    try:
+        with open('/proc/self/clear_refs', 'w') as refs:
+            refs.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(run: Callable[[], int], runs: int) -> Dict:
+    """Time `runs` calls of run() (each returns the rows it handled)"""
+    _reset_peak_rss()
+    samples, rows = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows += run()
+        samples.append((time.perf_counter() - start) * 1000)
+    total_seconds = sum(samples) / 1000
+    return {'runs': runs, 'p50_ms': percentile(samples, 50), 'p95_ms': percentile(samples, 95),
+            'mean_ms': statistics.mean(samples), 'ops_per_sec': runs / total_seconds if total_seconds else 0.0,
+            'rows_per_sec': rows / total_seconds if total_seconds else 0.0, 'peak_rss_mb': _peak_rss_mb()}
+
+
+def make_generator(kind: str, size: int, seed: int, workers: Optional[int]) -> DataGenerator:
+    if kind == 'classic':
+        return DataGenerator(size)
+    return BulkDataGenerator(size, seed=seed, workers=workers)
+
+
+def make_database(backend: str, workdir: str, size: int) -> DatabaseManager:
+    if backend == 'sqlite':
+        path = os.path.join(workdir, f'bench_{size}.db')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return DatabaseManager(backend=SQLiteBackend(path))
+    if backend == 'duckdb':
+        path = os.path.join(workdir, f'bench_{size}.duckdb')
+        if os.path.exists(path):
+            os.remove(path)
+        return DatabaseManager(backend=DuckDBBackend(path))
+    return DatabaseManager(backend=MySQLBackend(DatabaseManager().config))
+
+
+def bench_size(args, size: int) -> Dict:
+    results = {}
+
+    def generate() -> int:
+        generator = make_generator(args.generator, size, args.seed, args.workers)
+        return sum(len(batch) for table in DATA_TABLES for batch in generator.iter_batches(table, args.batch_size))
+    results['generate'] = measure(generate, 1)
+
+    db = make_database(args.backend, args.workdir, size)
+    db.create_tables()
+    db.connect()
+    db.clear_tables()
+    db.close()
+
+    def load() -> int:
+        generator = make_generator(args.generator, size, args.seed, args.workers)
+        return load_dataset(db, generator, batch_size=args.batch_size, report=None)
+    results['load'] = measure(load, 1)
+
+    rng = random.Random(args.seed)
+    criteria = [random_criteria(rng) for _ in range(args.runs)]
+    sort_columns = list(SORT_COLUMNS)
+
+    def query_phase(build) -> Dict:
+        pending = iter(range(args.runs))
+
+        def run() -> int:
+            i = next(pending)
+            return len(db.execute_query(*build(i), use_cache=False))
+        return measure(run, args.runs)
+
+    results['eligibility'] = query_phase(lambda i: build_eligibility_query(criteria[i]))
+    results['eligibility_page'] = query_phase(
+        lambda i: build_page_query(criteria[i], sort_columns[i % len(sort_columns)], i % 2 == 1, 50))
+    results['eligibility_count'] = query_phase(lambda i: build_count_query(criteria[i]))
+    for name, query in INSIGHT_QUERIES.items():
+        results[f'insight:{name}'] = query_phase(lambda i, query=query: (query, ()))
+    return results
+
+
+def regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Phases whose p50 grew by more than `threshold` (a fraction) over the baseline"""
+    found = []
+    for size, phases in current['results'].items():
+        for phase, result in phases.items():
+            before = baseline.get('results', {}).get(size, {}).get(phase)
+            if before is None or max(before['p50_ms'], result['p50_ms']) < MIN_REGRESSION_MS:
+                continue
+            if result['p50_ms'] > before['p50_ms'] * (1 + threshold):
+                found.append(f"{size} {phase}: p50 {before['p50_ms']:.1f} -> {result['p50_ms']:.1f} ms "
+                             f"(+{(result['p50_ms'] / before['p50_ms'] - 1) * 100:.0f}%)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generation, loading and dashboard queries")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100_000])
+    parser.add_argument('--runs', type=int, default=20, help="samples per query phase")
+    parser.add_argument('--backend', choices=['sqlite', 'duckdb', 'mysql'], default='sqlite')
+    parser.add_argument('--generator', choices=['bulk', 'classic'], default='bulk')
+    parser.add_argument('--workers', type=int, help="BulkDataGenerator processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="where the stand-in databases are created (default: a temp dir)")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed p50 slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+    args.workdir = args.workdir or tempfile.mkdtemp(prefix='placement_bench_')
+    os.makedirs(args.workdir, exist_ok=True)
+
+    report = {'meta': {'backend': args.backend, 'generator': args.generator, 'runs': args.runs,
+                       'seed': args.seed, 'python': platform.python_version(), 'machine': platform.machine(),
+                       'created': time.strftime('%Y-%m-%dT%H:%M:%S')},
+              'results': {}}
+    for size in args.sizes:
+        print(f"== {size} students ({args.backend})")
+        results = report['results'][str(size)] = bench_size(args, size)
+        print(f"{'phase':<38}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'rows/s':>12}{'peak MiB':>10}")
+        for phase, result in results.items():
+            print(f"{phase:<38}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['ops_per_sec']:>10.1f}"
+                  f"{result['rows_per_sec']:>12,.0f}{result['peak_rss_mb']:>10.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            found = regressions(report, json.load(baseline), args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        print(f"{len(found)} regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
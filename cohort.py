@@ -0,0 +1,313 @@
+"""Compact in-memory model of the whole cohort.
+
+One row per student with every attribute the dashboard filters, ranks or
+charts on:
+
+- course_batch, city, language, placement_status and company_name are
+  dictionary-encoded categoricals whose codes follow the eligibility.py value
+  sets (labels outside them are appended, never dropped)
+- scores bounded 0-100 are uint8, small counters uint16, the package float32
+  (the MySQL column is FLOAT), student_id int32
+- names and emails are not held per row; StudentDirectory fetches them by
+  student id on demand and interns them
+
+CohortModel holds this frame once per process (get_cohort_model) and keeps it
+current with writes; the columnar eligibility engine, the ranking model and
+the count cube all read from it instead of loading copies of their own.
+
+To compare bytes per student with a plain object-string DataFrame:
+
+    python cohort.py --report
+"""
+import argparse
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from database import DatabaseManager, SEED_MARKER_KEY, add_write_listener
+from eligibility import BATCHES, CITIES, COMPANIES, LANGUAGES, PLACEMENT_STATUSES
+from frames import to_frame
+
+COHORT_SELECT = '''
+    SELECT s.student_id, s.course_batch, s.city, p.language, p.problems_solved,
+        p.latest_project_score, p.certifications_earned, p.assessments_completed, p.mini_projects,
+        ss.communication, ss.teamwork, ss.presentation,
+        ss.leadership, ss.critical_thinking, ss.interpersonal_skills,
+        pl.placement_status, pl.mock_interview_score, pl.internships_completed,
+        pl.company_name, pl.placement_package, pl.placement_date, pl.interview_rounds_cleared,
+        CASE WHEN p.student_id IS NULL OR ss.student_id IS NULL OR pl.student_id IS NULL
+            THEN 0 ELSE 1 END AS joined
+'''
+
+COHORT_FROM = '''
+    FROM students s
+    LEFT JOIN programming p ON s.student_id = p.student_id
+    LEFT JOIN soft_skills ss ON s.student_id = ss.student_id
+    LEFT JOIN placements pl ON s.student_id = pl.student_id
+'''
+
+# (column, dtype) in COHORT_SELECT order
+COHORT_COLUMNS: List[Tuple[str, object]] = [
+    ('student_id', 'int32'),
+    ('course_batch', pd.CategoricalDtype(BATCHES)),
+    ('city', pd.CategoricalDtype(CITIES)),
+    ('language', pd.CategoricalDtype(LANGUAGES)),
+    ('problems_solved', 'uint16'),
+    ('latest_project_score', 'uint8'),
+    ('certifications_earned', 'uint16'),
+    ('assessments_completed', 'uint16'),
+    ('mini_projects', 'uint16'),
+    ('communication', 'uint8'),
+    ('teamwork', 'uint8'),
+    ('presentation', 'uint8'),
+    ('leadership', 'uint8'),
+    ('critical_thinking', 'uint8'),
+    ('interpersonal_skills', 'uint8'),
+    ('placement_status', pd.CategoricalDtype(PLACEMENT_STATUSES)),
+    ('mock_interview_score', 'uint8'),
+    ('internships_completed', 'uint16'),
+    ('company_name', pd.CategoricalDtype(COMPANIES)),
+    ('placement_package', 'float32'),
+    ('placement_date', 'datetime64[ns]'),
+    ('interview_rounds_cleared', 'uint16'),
+    # 1 when the student has a row in every child table (the inner join the SQL paths use)
+    ('joined', 'uint8'),
+]
+
+# Rows per fetchmany() while loading, and ids per IN (...) in refreshes and directory lookups
+FETCH_SIZE = 50000
+ID_CHUNK = 1000
+
+
+def compact_frame(rows: List[Tuple]) -> pd.DataFrame:
+    """Cohort rows (COHORT_SELECT order; extra trailing values ignored) as a compact DataFrame"""
+    return to_frame(rows, [name for name, _ in COHORT_COLUMNS], [dtype for _, dtype in COHORT_COLUMNS])
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+    # Chunks can append different unseen labels; union keeps the columns categorical
+    columns = {}
+    for name in frames[0].columns:
+        if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+            columns[name] = union_categoricals([frame[name] for frame in frames])
+        else:
+            columns[name] = pd.concat([frame[name] for frame in frames], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def load_cohort(db, fetch_size: int = FETCH_SIZE) -> pd.DataFrame:
+    """Every student as one compact row, ordered by student_id"""
+    frames = []
+    with db.connection() as conn:
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(COHORT_SELECT + COHORT_FROM + ' ORDER BY s.student_id')
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                frames.append(compact_frame(rows))
+        finally:
+            cursor.close()
+    return _concat(frames) if frames else compact_frame([])
+
+
+class CohortModel:
+    """The compact cohort frame, loaded once and refreshed per written student.
+
+    The frame is replaced on every change, never modified in place, so a reader
+    holding a snapshot() keeps a consistent view; `version` moves with it.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.frame = compact_frame([])  # sorted by student_id
+        self.version = 0
+        self.data_version = None
+        self._dirty: Set[int] = set()
+        self._stale = True
+        self._lock = threading.RLock()
+
+    def load(self):
+        """Read every student from the database"""
+        with self._lock:
+            self._dirty.clear()
+            self._stale = False
+            self.data_version = self.db.get_meta(SEED_MARKER_KEY)
+            self._replace(load_cohort(self.db))
+
+    def refresh(self, student_ids: Set[int]):
+        """Re-read only the given students, updating, adding or dropping their rows"""
+        with self._lock:
+            ids = sorted(student_ids)
+            rows = []
+            for start in range(0, len(ids), ID_CHUNK):
+                chunk = ids[start:start + ID_CHUNK]
+                rows.extend(self.db.execute_query(
+                    COHORT_SELECT + COHORT_FROM +
+                    ' WHERE s.student_id IN ({})'.format(','.join(['%s'] * len(chunk))),
+                    tuple(chunk), use_cache=False))
+            frames = [self.frame[~self.frame['student_id'].isin(ids)]]
+            if rows:
+                frames.append(compact_frame(rows))
+            self._replace(_concat(frames).sort_values('student_id', kind='stable', ignore_index=True))
+
+    def _replace(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.version += 1
+
+    def mark_dirty(self, table: str, student_ids: Optional[Set[int]]):
+        """Write listener: remember which students to re-read before the next read"""
+        with self._lock:
+            if student_ids is None:
+                self._stale = True
+            else:
+                self._dirty.update(student_ids)
+
+    def sync(self):
+        """Apply pending changes, reloading fully after a reseed or table wipe"""
+        with self._lock:
+            if self._stale or self.db.get_meta(SEED_MARKER_KEY) != self.data_version:
+                self.load()
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                self.refresh(dirty)
+
+    def snapshot(self) -> Tuple[int, pd.DataFrame]:
+        """(version, frame) as of now"""
+        with self._lock:
+            return self.version, self.frame
+
+    def memory_bytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True).sum())
+
+
+_cohort: Optional[CohortModel] = None
+_cohort_lock = threading.Lock()
+
+
+def get_cohort_model() -> CohortModel:
+    """Process-wide cohort, loaded on first use and kept in sync with writes"""
+    global _cohort
+    with _cohort_lock:
+        if _cohort is None:
+            # Own manager so sessions never share a checked-out connection
+            _cohort = CohortModel(DatabaseManager())
+            add_write_listener(_cohort.mark_dirty)
+    _cohort.sync()
+    return _cohort
+
+
+def column_values(series: pd.Series) -> np.ndarray:
+    """A cohort column as a NumPy array with NULLs as 0; a view unless the column has NULLs"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Codes, -1 for NULL
+        return series.cat.codes.to_numpy()
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+    return series.to_numpy()
+
+
+class StudentDirectory:
+    """Names and emails by student id, fetched on demand, interned and kept in a bounded LRU"""
+
+    def __init__(self, db, max_entries: int = 100_000):
+        self.db = db
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[int, Tuple[str, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, student_ids: Iterable[int]) -> Dict[int, Tuple[str, str]]:
+        """(name, email) per id; ids without a student are left out"""
+        ids = [int(student_id) for student_id in student_ids]
+        with self._lock:
+            found = {student_id: self._entries[student_id] for student_id in ids if student_id in self._entries}
+            for student_id in found:
+                self._entries.move_to_end(student_id)
+        missing = sorted(set(ids) - set(found))
+        for start in range(0, len(missing), ID_CHUNK):
+            chunk = missing[start:start + ID_CHUNK]
+            rows = self.db.execute_query(
+                'SELECT student_id, name, email FROM students WHERE student_id IN ({})'.format(
+                    ','.join(['%s'] * len(chunk))), tuple(chunk), use_cache=False)
+            with self._lock:
+                for student_id, name, email in rows:
+                    entry = (sys.intern(name) if name is not None else None,
+                             sys.intern(email) if email is not None else None)
+                    found[student_id] = self._entries[student_id] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            entries = list(self._entries.values())
+        # Interned strings shared between entries are counted once
+        strings = {id(value): value for entry in entries for value in entry if value is not None}
+        return sys.getsizeof(self._entries) + sum(sys.getsizeof(entry) for entry in entries) + \
+            sum(sys.getsizeof(value) for value in strings.values())
+
+
+def memory_report(db, fetch_size: int = FETCH_SIZE, page_size: int = 50) -> Dict[str, float]:
+    """Bytes per student of a plain object-string DataFrame (with names and emails)
+    versus the compact frame plus the directory entries for one page of students"""
+    students = object_bytes = 0
+    frames = []
+    with db.connection() as conn:
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(COHORT_SELECT.rstrip() + ', s.name, s.email' + COHORT_FROM + ' ORDER BY s.student_id')
+            names = [name for name, _ in COHORT_COLUMNS] + ['name', 'email']
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                students += len(rows)
+                # The naive representation, measured chunk by chunk so it never has to fit at once
+                object_bytes += pd.DataFrame(rows, columns=names, dtype=object).memory_usage(deep=True).sum()
+                frames.append(compact_frame(rows))
+        finally:
+            cursor.close()
+    compact = _concat(frames) if frames else compact_frame([])
+    directory = StudentDirectory(db)
+    directory.lookup(compact['student_id'].head(page_size).tolist())
+    compact_bytes = int(compact.memory_usage(deep=True).sum())
+    per_student = max(1, students)
+    return {
+        'students': students,
+        'object_bytes_per_student': object_bytes / per_student,
+        'compact_bytes_per_student': compact_bytes / per_student,
+        'directory_bytes': directory.memory_bytes(),
+        'object_mib': object_bytes / 2 ** 20,
+        'compact_mib': compact_bytes / 2 ** 20,
+        'columns': {name: int(compact[name].memory_usage(deep=True, index=False)) / per_student
+                    for name in compact.columns},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used per student by the compact cohort model")
+    parser.add_argument('--report', action='store_true', help="compare with a plain object-string DataFrame")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    if not args.report:
+        cohort = load_cohort(db)
+        print(f"Loaded {len(cohort)} students in {cohort.memory_usage(deep=True).sum() / 2 ** 20:.1f} MiB")
+        return
+    report = memory_report(db)
+    print(f"{report['students']} students")
+    print(f"object strings : {report['object_bytes_per_student']:8.1f} bytes/student ({report['object_mib']:.1f} MiB)")
+    print(f"compact        : {report['compact_bytes_per_student']:8.1f} bytes/student ({report['compact_mib']:.1f} MiB)")
+    print(f"directory      : {report['directory_bytes']} bytes for one page of names/emails")
+    for name, size in report['columns'].items():
+        print(f"  {name:<24}{size:6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,35 @@
-from faker import Faker
 import random
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+from eligibility import BATCHES, CITIES, COMPANIES, LANGUAGES, PLACEMENT_STATUSES
+
+# Rows per batch yielded by iter_batches
+DEFAULT_BATCH_SIZE = 5000
 
 class DataGenerator:
     def __init__(self, num_records: int = 100):
+        # Imported here so importing this module does not load Faker
+        from faker import Faker
         self.fake = Faker()
         self.num_records = num_records
-        self.batches = ['DS_2023', 'DS_2024', 'DS_2025']
-        self.languages = ['Python', 'SQL', 'Java']
-        self.cities = ['New York', 'San Francisco', 'Boston', 'Chicago', 'Seattle']
-        self.companies = ['Google', 'Amazon', 'Microsoft', 'Infosys', 'TCS', 'Wipro', 'Accenture', 'Deloitte', 'Capgemini', 'OtherTech']
+        self.batches = list(BATCHES)
+        self.languages = list(LANGUAGES)
+        self.cities = list(CITIES)
+        self.companies = list(COMPANIES)
+        self.statuses = list(PLACEMENT_STATUSES)
 
     def generate_students(self) -> List[Tuple]:
         """Generate student data"""
-        students = []
+        return list(self._student_rows())
+
+    def _student_rows(self) -> Iterator[Tuple]:
         for i in range(1, self.num_records + 1):
-            students.append((
+            yield (
                 i,
                 self.fake.name(),
                 random.randint(18, 25),
@@ -27,14 +40,15 @@ class DataGenerator:
                 random.choice(self.batches),
                 random.choice(self.cities),
                 random.randint(2023, 2026)
-            ))
-        return students
+            )
 
     def generate_programming(self) -> List[Tuple]:
         """Generate programming performance data"""
-        programming = []
+        return list(self._programming_rows())
+
+    def _programming_rows(self) -> Iterator[Tuple]:
         for i in range(1, self.num_records + 1):
-            programming.append((
+            yield (
                 i,
                 i,  # student_id
                 random.choice(self.languages),
@@ -43,14 +57,15 @@ class DataGenerator:
                 random.randint(1, 5),
                 random.randint(0, 3),
                 random.randint(60, 100)
-            ))
-        return programming
+            )
 
     def generate_soft_skills(self) -> List[Tuple]:
         """Generate soft skills data"""
-        soft_skills = []
+        return list(self._soft_skill_rows())
+
+    def _soft_skill_rows(self) -> Iterator[Tuple]:
         for i in range(1, self.num_records + 1):
-            soft_skills.append((
+            yield (
                 i,
                 i,  # student_id
                 random.randint(50, 100),
@@ -59,20 +74,21 @@ class DataGenerator:
                 random.randint(50, 100),
                 random.randint(50, 100),
                 random.randint(50, 100)
-            ))
-        return soft_skills
+            )
 
     def generate_placements(self) -> List[Tuple]:
         """Generate placement data with non-NULL values for all columns"""
-        placements = []
+        return list(self._placement_rows())
+
+    def _placement_rows(self) -> Iterator[Tuple]:
         for i in range(1, self.num_records + 1):
-            status = random.choice(['Ready', 'Not Ready', 'Placed'])
+            status = random.choice(self.statuses)
             company = random.choice(self.companies)
             package = random.uniform(30000, 80000)  # Salary between 30k and 80k
             date = self.fake.date_between(start_date=datetime(2024, 1, 1), end_date=datetime(2025, 6, 25))
             rounds = random.randint(1, 4) if status == 'Placed' else random.randint(0, 2)
             
-            placements.append((
+            yield (
                 i,
                 i,  # student_id
                 random.randint(50, 100),
@@ -82,5 +98,150 @@ class DataGenerator:
                 package,
                 rounds,
                 date
-            ))
-        return placements
\ No newline at end of file
+            )
+
+    def iter_batches(self, table: str, batch_size: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """Yield the table's rows in lists of at most batch_size, in id order"""
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        rows = {'students': self._student_rows, 'programming': self._programming_rows,
+                'soft_skills': self._soft_skill_rows, 'placements': self._placement_rows}[table]()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+# Tables in generation order and the column layout insert_data expects for each
+BULK_TABLES = ['students', 'programming', 'soft_skills', 'placements']
+
+
+def _generate_chunk(table: str, start: int, stop: int, seed: int, pools: dict) -> List[Tuple]:
+    """Rows start..stop-1 of one table; deterministic for a given (seed, table, start)"""
+    rng = np.random.default_rng([seed, BULK_TABLES.index(table), start])
+    n = stop - start
+    ids = np.arange(start, stop)
+
+    if table == 'students':
+        first = np.asarray(pools['first_names'])[rng.integers(0, len(pools['first_names']), n)]
+        last = np.asarray(pools['last_names'])[rng.integers(0, len(pools['last_names']), n)]
+        names = [f"{f} {l}" for f, l in zip(first, last)]
+        # The id suffix keeps emails unique without a uniqueness set
+        emails = [f"{f}.{l}.{i}@example.com".lower() for f, l, i in zip(first, last, ids.tolist())]
+        phones = [f"+1-{a}-{b:03d}-{c:04d}" for a, b, c in zip(
+            rng.integers(200, 1000, n).tolist(), rng.integers(0, 1000, n).tolist(), rng.integers(0, 10000, n).tolist())]
+        columns = [
+            ids.tolist(),
+            names,
+            rng.integers(18, 26, n).tolist(),
+            np.asarray(pools['genders'])[rng.integers(0, len(pools['genders']), n)].tolist(),
+            emails,
+            phones,
+            rng.integers(2021, 2025, n).tolist(),
+            np.asarray(pools['batches'])[rng.integers(0, len(pools['batches']), n)].tolist(),
+            np.asarray(pools['cities'])[rng.integers(0, len(pools['cities']), n)].tolist(),
+            rng.integers(2023, 2027, n).tolist(),
+        ]
+    elif table == 'programming':
+        columns = [
+            ids.tolist(),
+            ids.tolist(),  # student_id
+            np.asarray(pools['languages'])[rng.integers(0, len(pools['languages']), n)].tolist(),
+            rng.integers(10, 101, n).tolist(),
+            rng.integers(5, 21, n).tolist(),
+            rng.integers(1, 6, n).tolist(),
+            rng.integers(0, 4, n).tolist(),
+            rng.integers(60, 101, n).tolist(),
+        ]
+    elif table == 'soft_skills':
+        columns = [ids.tolist(), ids.tolist()] + [rng.integers(50, 101, n).tolist() for _ in range(6)]
+    elif table == 'placements':
+        status_codes = rng.integers(0, len(pools['statuses']), n)
+        placed = np.asarray(pools['statuses'])[status_codes] == 'Placed'
+        rounds = np.where(placed, rng.integers(1, 5, n), rng.integers(0, 3, n))
+        days = rng.integers(0, pools['date_span_days'] + 1, n)
+        dates = (np.datetime64(pools['date_start'], 'D') + days).tolist()
+        columns = [
+            ids.tolist(),
+            ids.tolist(),  # student_id
+            rng.integers(50, 101, n).tolist(),
+            rng.integers(0, 4, n).tolist(),
+            np.asarray(pools['statuses'])[status_codes].tolist(),
+            np.asarray(pools['companies'])[rng.integers(0, len(pools['companies']), n)].tolist(),
+            rng.uniform(30000, 80000, n).tolist(),
+            rounds.tolist(),
+            dates,
+        ]
+    else:
+        raise ValueError(f"Unknown table: {table}")
+    return list(zip(*columns))
+
+
+class BulkDataGenerator(DataGenerator):
+    """High-volume generator for load tests.
+
+    Numeric columns are drawn with NumPy per chunk of ids, names come from
+    pools built once with Faker, and emails embed the student id so they are
+    unique without Faker's uniqueness tracking. Each chunk is seeded from
+    (seed, table, first id), so output is reproducible for a given seed no
+    matter how many worker processes generate it.
+    """
+
+    def __init__(self, num_records: int = 100, seed: int = 0, workers: Optional[int] = None,
+                 chunk_size: int = 50000, name_pool_size: int = 1000):
+        super().__init__(num_records)
+        self.seed = seed
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.fake.seed_instance(seed)
+        start, end = datetime(2024, 1, 1), datetime(2025, 6, 25)
+        self.pools = {
+            'first_names': [self.fake.first_name() for _ in range(name_pool_size)],
+            'last_names': [self.fake.last_name() for _ in range(name_pool_size)],
+            'genders': ['Male', 'Female', 'Other'],
+            'statuses': self.statuses,
+            'batches': self.batches,
+            'languages': self.languages,
+            'cities': self.cities,
+            'companies': self.companies,
+            'date_start': start.strftime('%Y-%m-%d'),
+            'date_span_days': (end - start).days,
+        }
+
+    def _ranges(self, size: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + size, self.num_records + 1))
+                for start in range(1, self.num_records + 1, size)]
+
+    def iter_batches(self, table: str, batch_size: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """Yield the table's rows one id-range chunk at a time, in id order"""
+        ranges = self._ranges(batch_size or self.chunk_size)
+        if self.workers <= 1 or len(ranges) == 1:
+            for start, stop in ranges:
+                yield _generate_chunk(table, start, stop, self.seed, self.pools)
+            return
+
+        # Keep a bounded window of chunks in flight so memory does not grow with num_records
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for start, stop in ranges:
+                pending.append(executor.submit(_generate_chunk, table, start, stop, self.seed, self.pools))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def generate_students(self) -> List[Tuple]:
+        """Generate student data"""
+        return [row for batch in self.iter_batches('students') for row in batch]
+
+    def generate_programming(self) -> List[Tuple]:
+        """Generate programming performance data"""
+        return [row for batch in self.iter_batches('programming') for row in batch]
+
+    def generate_soft_skills(self) -> List[Tuple]:
+        """Generate soft skills data"""
+        return [row for batch in self.iter_batches('soft_skills') for row in batch]
+
+    def generate_placements(self) -> List[Tuple]:
+        """Generate placement data with non-NULL values for all columns"""
+        return [row for batch in self.iter_batches('placements') for row in batch]
@@ -1,29 +1,362 @@
-import mysql.connector
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 from dotenv import load_dotenv
+import itertools
 import os
+import queue
+import threading
+import tempfile
+import time
+from backends import Backend, get_backend
+from query_cache import get_query_cache, normalize_query, tables_in
+from query_stats import get_query_stats
+from shared_cache import cache_key, get_shared_cache
+from summaries import (SUMMARIES, SUMMARY_MARKER_KEY, SUMMARY_TABLES, SUMMARY_VERSION, apply_delta,
+                       clear_summaries, create_summary_tables, rebuild_summaries, summaries_for)
+
+# Bump whenever the table definitions in create_tables change
+SCHEMA_VERSION = 2
+
+# Data tables in foreign-key order (parents first)
+DATA_TABLES = ['students', 'programming', 'soft_skills', 'placements']
+
+# Base tables behind each summary table, for shared-cache keys
+_SUMMARY_SOURCES = {summary.table: summary.sources for summary in SUMMARIES}
+
+# Position of student_id in the row tuples insert_data accepts for each table
+STUDENT_ID_POSITION = {'students': 0, 'programming': 1, 'soft_skills': 1, 'placements': 1}
+
+# app_meta key holding the marker written by seed.py after a complete seed
+SEED_MARKER_KEY = 'seed_version'
+
+# Columns insert_data expects in each row tuple, in order
+TABLE_COLUMNS = {
+    'students': ['student_id', 'name', 'age', 'gender', 'email', 'phone',
+                 'enrollment_year', 'course_batch', 'city', 'graduation_year'],
+    'programming': ['programming_id', 'student_id', 'language', 'problems_solved', 'assessments_completed',
+                    'mini_projects', 'certifications_earned', 'latest_project_score'],
+    'soft_skills': ['soft_skill_id', 'student_id', 'communication', 'teamwork', 'presentation',
+                    'leadership', 'critical_thinking', 'interpersonal_skills'],
+    'placements': ['placement_id', 'student_id', 'mock_interview_score', 'internships_completed',
+                   'placement_status', 'company_name', 'placement_package', 'interview_rounds_cleared',
+                   'placement_date'],
+}
+
+# Unique columns besides the primary keys; upsert_data keeps their values with one student
+UNIQUE_COLUMNS = {'students': ['email']}
+
+# Duplicate students are skipped rather than failing the load
+INSERT_STATEMENTS = {
+    table: '{} INTO {} ({}) VALUES ({})'.format(
+        'INSERT IGNORE' if table == 'students' else 'INSERT', table,
+        ', '.join(columns), ', '.join(['%s'] * len(columns)))
+    for table, columns in TABLE_COLUMNS.items()
+}
+
+# Rows per transaction in upsert_data
+UPSERT_BATCH_SIZE = int(os.getenv('UPSERT_BATCH_SIZE', '1000'))
+
+# Values per IN (...) when checking which student owns a child row id or an email
+ID_CHUNK = 1000
+
+# Watermarks of change-log history kept per table; consumers further behind reload fully
+CHANGE_LOG_KEEP = int(os.getenv('CHANGE_LOG_KEEP', '10000'))
+
+# LOAD DATA LOCAL INFILE may only read files from this directory
+BULK_LOAD_DIR = os.path.join(tempfile.gettempdir(), 'placement_bulk_load')
+
+# Rows per temp file when insert_data(bulk=True) has no commit_every
+BULK_CHUNK_ROWS = 200000
+
+# Server/client errors meaning LOAD DATA LOCAL is disabled
+LOCAL_INFILE_ERRORS = {1148, 2068, 3948}
+
+# Stored so the soft-skills threshold can use an index; same value as the
+# (communication + teamwork + presentation)/3 expression it replaces
+AVG_SOFT_SKILLS_COLUMN = 'avg_soft_skills DECIMAL(7,4) AS ((communication + teamwork + presentation) / 3) STORED'
+
+# (table, index name, columns, unique). InnoDB appends the primary key to every
+# secondary index, so idx_students_batch also covers (course_batch, student_id).
+SECONDARY_INDEXES = [
+    ('students', 'idx_students_batch', 'course_batch', False),
+    ('programming', 'uq_programming_student', 'student_id', True),
+    ('programming', 'idx_programming_eligibility',
+     'problems_solved, assessments_completed, mini_projects, student_id', False),
+    ('soft_skills', 'uq_soft_skills_student', 'student_id', True),
+    ('soft_skills', 'idx_soft_skills_avg', 'avg_soft_skills, student_id', False),
+    ('placements', 'uq_placements_student', 'student_id', True),
+    ('placements', 'idx_placements_status', 'placement_status', False),
+    ('placements', 'idx_placements_date', 'placement_date', False),
+    ('placements', 'idx_placements_mock', 'mock_interview_score, student_id', False),
+]
+
+# Idle connections older than this are pinged before being handed out again
+POOL_PING_AFTER = 30.0
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class QueryTimeoutError(Exception):
+    """Reported for a concurrent query that did not finish before its deadline"""
+
+
+class QueryResult(NamedTuple):
+    """Outcome of one query from execute_concurrent; error is set instead of rows on failure"""
+    rows: Optional[List[Tuple]]
+    error: Optional[Exception] = None
+    seconds: float = 0.0
+
+
+class ConnectionPool:
+    """Bounded pool of backend connections shared by every DatabaseManager in the process"""
+
+    def __init__(self, backend: Backend, size: int = 5, timeout: float = 10.0):
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._in_use = 0
+        self._stats = {'checkouts': 0, 'waits': 0, 'timeouts': 0,
+                       'connections_created': 0, 'wait_seconds': 0.0}
+
+    def _create(self):
+        conn = self.backend.connect()
+        with self._lock:
+            self._stats['connections_created'] += 1
+        return conn
+
+    def acquire(self):
+        """Check out a connection, opening one if the pool is below its size"""
+        try:
+            conn, released_at = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._open < self.size
+                if can_open:
+                    self._open += 1
+            if can_open:
+                try:
+                    conn, released_at = self._create(), time.monotonic()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            else:
+                start = time.monotonic()
+                try:
+                    conn, released_at = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats['waits'] += 1
+                        self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection free after {self.timeout}s (pool size {self.size})")
+                with self._lock:
+                    self._stats['waits'] += 1
+                    self._stats['wait_seconds'] += time.monotonic() - start
+
+        if time.monotonic() - released_at > POOL_PING_AFTER:
+            try:
+                self.backend.ping(conn)
+            except Exception:
+                # Dead connection: close it and reopen in the same slot, or give the slot up
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._in_use += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, ending any open transaction"""
+        try:
+            if getattr(conn, 'in_transaction', False):
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except Exception:
+            # Broken connection: drop it so the slot can be reopened
+            with self._lock:
+                self._open -= 1
+        finally:
+            with self._lock:
+                self._in_use -= 1
+
+    @contextmanager
+    def connection(self):
+        """Context manager that always returns the connection to the pool"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict:
+        """Checkout/wait counters plus current pool occupancy"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(size=self.size, open=self._open, in_use=self._in_use,
+                         idle=self._open - self._in_use)
+        return stats
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(backend: Backend, size: int = 5, timeout: float = 10.0) -> ConnectionPool:
+    """Return the process-wide pool for a backend's database, creating it once"""
+    with _pools_lock:
+        pool = _pools.get(backend.key)
+        if pool is None:
+            pool = _pools[backend.key] = ConnectionPool(backend, size, timeout)
+        return pool
+
+
+_query_executor: Optional[ThreadPoolExecutor] = None
+_query_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> ThreadPoolExecutor:
+    """Process-wide worker threads for execute_concurrent (DB_QUERY_WORKERS, default and
+    at most DB_POOL_SIZE: each worker holds a pooled connection, so extra ones would only
+    queue on the pool)"""
+    global _query_executor
+    with _query_executor_lock:
+        if _query_executor is None:
+            pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+            workers = min(int(os.getenv('DB_QUERY_WORKERS', str(pool_size))), pool_size)
+            _query_executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='db-query')
+        return _query_executor
+
+
+_write_listeners: List[Callable[[str, Optional[Set[int]]], None]] = []
+
+# Last change watermark this process has applied, per (backend key, table)
+_seen_watermarks: Dict[Tuple, int] = {}
+_watermark_lock = threading.Lock()
+
+# Backend keys whose schema create_tables() has brought up to date in this process
+_schema_ready: Set[Tuple] = set()
+_schema_lock = threading.Lock()
+
+
+def add_write_listener(listener: Callable[[str, Optional[Set[int]]], None]):
+    """Call listener(table, student_ids) after each committed write; None means the whole table changed"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def _notify_write(table: str, student_ids: Optional[Set[int]]):
+    for listener in list(_write_listeners):
+        listener(table, student_ids)
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _csv_line(row: Tuple) -> str:
+    """One row in the CSV dialect used by LOAD DATA (quoted strings, bare NULL, no escapes)"""
+    return ','.join(_csv_value(value) for value in row) + '\n'
+
+
+def _is_select(query: str) -> bool:
+    return query.lstrip().upper().startswith(('SELECT', 'WITH'))
+
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, pool_size: Optional[int] = None, pool_timeout: Optional[float] = None,
+                 backend: Optional[Backend] = None):
         load_dotenv()
         self.config = {
             'host': os.getenv('DB_HOST', 'localhost'),
             'user': os.getenv('DB_USER', 'root'),
             'password': os.getenv('DB_PASSWORD', ''),
-            'database': os.getenv('DB_NAME', 'placement_db')
+            'database': os.getenv('DB_NAME', 'placement_db'),
+            'allow_local_infile_in_path': BULK_LOAD_DIR,
         }
+        self.backend = backend or get_backend(self.config)
+        self.pool = get_pool(
+            self.backend,
+            size=pool_size or int(os.getenv('DB_POOL_SIZE', '5')),
+            timeout=pool_timeout or float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        )
+        self.cache = get_query_cache()
+        # Cross-process tier behind the in-memory cache (None unless SHARED_CACHE is set)
+        self.shared = get_shared_cache()
+        self.stats = get_query_stats()
         self.conn = None
         self.cursor = None
 
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of a with-block"""
+        with self.pool.connection() as conn:
+            yield conn
+
+    def pool_stats(self) -> Dict:
+        """Checkout, wait and connection-creation counters for the shared pool"""
+        return self.pool.stats()
+
     def connect(self):
-        """Establish database connection"""
-        self.conn = mysql.connector.connect(**self.config)
-        self.cursor = self.conn.cursor()
+        """Check out a pooled connection for this manager until close() is called"""
+        if self.conn is None:
+            self.conn = self.pool.acquire()
+        if self.cursor is None:
+            self.cursor = self.conn.cursor()
+
+    @contextmanager
+    def session(self):
+        """Hold one pooled connection as self.conn for a with-block; it goes back to the
+        pool on any exit, including exceptions and Streamlit reruns or stops"""
+        opened = self.conn is None
+        self.connect()
+        try:
+            yield self
+        finally:
+            if opened:
+                self.close()
+
+    def ensure_schema(self):
+        """Run create_tables() once per process and database; later calls are a set lookup"""
+        key = self.backend.key
+        if key in _schema_ready:
+            return
+        with _schema_lock:
+            if key not in _schema_ready:
+                self.create_tables()
+                _schema_ready.add(key)
 
     def create_tables(self):
         """Create all required tables with relationships"""
-        self.connect()
-        
+        if self.backend.read_only:
+            # Parquet snapshot views already define the tables
+            return
+        with self.session():
+            self._create_tables()
+
+    def _create_tables(self):
         # Students Table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS students (
@@ -66,6 +399,7 @@ class DatabaseManager:
                 leadership INT,
                 critical_thinking INT,
                 interpersonal_skills INT,
+                avg_soft_skills DECIMAL(7,4) AS ((communication + teamwork + presentation) / 3) STORED,
                 FOREIGN KEY (student_id) REFERENCES students(student_id)
             )
         ''')
@@ -85,48 +419,608 @@ class DatabaseManager:
                 FOREIGN KEY (student_id) REFERENCES students(student_id)
             )
         ''')
-        
+
+        # Metadata Table (seed/schema version markers)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_meta (
+                meta_key VARCHAR(100) PRIMARY KEY,
+                meta_value VARCHAR(255) NOT NULL
+            )
+        ''')
+
+        # Per-table change watermarks and the students written under each one.
+        # Changes at or below reset_at were bulk writes without per-student entries.
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_watermarks (
+                table_name VARCHAR(50) PRIMARY KEY,
+                watermark INT NOT NULL,
+                reset_at INT NOT NULL
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                table_name VARCHAR(50) NOT NULL,
+                watermark INT NOT NULL,
+                student_id INT NOT NULL,
+                PRIMARY KEY (table_name, watermark, student_id)
+            )
+        ''')
+
+        # Materialized aggregates behind the grouped insights
+        create_summary_tables(self.cursor)
+
+        if self.backend.name == 'mysql':
+            self._migrate_schema()
+        else:
+            self._create_indexes()
+        self.conn.commit()
+
+        # Summary tables that are new or built by an older definition are rebuilt once
+        if self.get_meta(SUMMARY_MARKER_KEY) != str(SUMMARY_VERSION):
+            self.rebuild_summaries()
+
+    def _migrate_schema(self):
+        """Add generated columns and secondary indexes missing from tables created by older versions"""
+        self.cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'soft_skills' AND COLUMN_NAME = 'avg_soft_skills'
+        ''')
+        if self.cursor.fetchone()[0] == 0:
+            self.cursor.execute("ALTER TABLE soft_skills ADD COLUMN " + AVG_SOFT_SKILLS_COLUMN)
+
+        self.cursor.execute('''
+            SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+        ''')
+        existing = {(table.lower(), index.lower()) for table, index in self.cursor.fetchall()}
+        for table, name, columns, unique in SECONDARY_INDEXES:
+            if (table, name) not in existing:
+                self.cursor.execute('CREATE {}INDEX {} ON {} ({})'.format(
+                    'UNIQUE ' if unique else '', name, table, columns))
+
+    def _create_indexes(self):
+        """Secondary indexes for the embedded backends, which support IF NOT EXISTS"""
+        for table, name, columns, unique in SECONDARY_INDEXES:
+            if self.backend.name == 'duckdb' and 'avg_soft_skills' in columns:
+                # DuckDB cannot index its virtual generated column
+                continue
+            self.cursor.execute('CREATE {}INDEX IF NOT EXISTS {} ON {} ({})'.format(
+                'UNIQUE ' if unique else '', name, table, columns))
+
+    def rebuild_summaries(self):
+        """Recompute every summary table from the base tables"""
+        opened = self.conn is None
+        self.connect()
+        try:
+            rebuild_summaries(self.cursor)
+            self.set_meta(SUMMARY_MARKER_KEY, str(SUMMARY_VERSION))
+            self.cache.invalidate(SUMMARY_TABLES, self.backend.key)
+        finally:
+            if opened:
+                self.close()
+
+    def explain(self, query: str, params: tuple = (), conn=None) -> List[Dict]:
+        """EXPLAIN a query and return one dict per plan row, on `conn` or the session's
+        connection when there is one (a second checkout could wait on a busy pool)"""
+        conn = conn or self.conn
+        if conn is None:
+            with self.connection() as conn:
+                return self.explain(query, params, conn)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self.backend.explain_prefix + query, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a value from the metadata table"""
+        rows = self.execute_query("SELECT meta_value FROM app_meta WHERE meta_key = %s", (key,), use_cache=False)
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        """Write a value to the metadata table"""
+        self.cursor.execute('''
+            INSERT INTO app_meta (meta_key, meta_value) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE meta_value = VALUES(meta_value)
+        ''', (key, value))
+        self.conn.commit()
+
+    def delete_meta(self, key: str):
+        """Remove a value from the metadata table"""
+        self.cursor.execute("DELETE FROM app_meta WHERE meta_key = %s", (key,))
         self.conn.commit()
 
-    def insert_data(self, table: str, data: List[Tuple]):
-        """Insert data into specified table"""
-        if table == 'students':
-            self.cursor.executemany('''
-                INSERT IGNORE INTO students 
-                (student_id, name, age, gender, email, phone, enrollment_year, course_batch, city, graduation_year)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', data)
-        elif table == 'programming':
-            self.cursor.executemany('''
-                INSERT INTO programming 
-                (programming_id, student_id, language, problems_solved, assessments_completed, 
-                 mini_projects, certifications_earned, latest_project_score)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ''', data)
-        elif table == 'soft_skills':
-            self.cursor.executemany('''
-                INSERT INTO soft_skills 
-                (soft_skill_id, student_id, communication, teamwork, presentation, 
-                 leadership, critical_thinking, interpersonal_skills)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ''', data)
-        elif table == 'placements':
-            self.cursor.executemany('''
-                INSERT INTO placements 
-                (placement_id, student_id, mock_interview_score, internships_completed, 
-                 placement_status, company_name, placement_package, interview_rounds_cleared, placement_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', data)
-        
+    def clear_tables(self):
+        """Delete all rows from the data tables, children first"""
+        self.cursor.execute("DELETE FROM placements")
+        self.cursor.execute("DELETE FROM soft_skills")
+        self.cursor.execute("DELETE FROM programming")
+        self.cursor.execute("DELETE FROM students")
+        clear_summaries(self.cursor)
+        self.cursor.execute("DELETE FROM change_log")
+        watermarks = {table: self._advance_watermark(table, None) for table in DATA_TABLES}
         self.conn.commit()
+        self.cache.invalidate(DATA_TABLES + SUMMARY_TABLES, self.backend.key)
+        for table in DATA_TABLES:
+            self._mark_seen(table, watermarks[table])
+            _notify_write(table, None)
+
+    def insert_data(self, table: str, data: Iterable[Tuple], batch_size: Optional[int] = None,
+                    commit_every: Optional[int] = None,
+                    on_batch: Optional[Callable[[int], None]] = None, bulk: bool = False) -> int:
+        """Insert rows into specified table in batches and return the number of rows sent.
+
+        Rows are consumed lazily from `data`, `batch_size` rows per executemany
+        (all rows at once when None), with a commit at least every
+        `commit_every` rows (only at the end when None).
+
+        With bulk=True, rows are written to temp CSV files of `commit_every`
+        rows and ingested with LOAD DATA LOCAL INFILE, falling back to batched
+        INSERTs if the server does not allow local infile. Backends other than
+        MySQL always use batched INSERTs.
+        """
+        opened = self.conn is None
+        self.connect()
+        statement = INSERT_STATEMENTS[table]
+        position = STUDENT_ID_POSITION[table]
+        rows_iter = iter(data)
+        total = uncommitted_rows = 0
+        uncommitted_ids = set()
+        try:
+            if bulk and self.backend.local_infile:
+                total, rows_iter = self._load_data_infile(table, rows_iter, commit_every or BULK_CHUNK_ROWS, on_batch)
+            while rows_iter is not None:
+                batch = list(itertools.islice(rows_iter, batch_size)) if batch_size else list(rows_iter)
+                if not batch:
+                    break
+                self.cursor.executemany(statement, batch)
+                total += len(batch)
+                uncommitted_rows += len(batch)
+                uncommitted_ids.update(row[position] for row in batch)
+                if commit_every and uncommitted_rows >= commit_every:
+                    self._commit_insert(table, uncommitted_ids)
+                    uncommitted_rows, uncommitted_ids = 0, set()
+                if on_batch:
+                    on_batch(len(batch))
+                if not batch_size:
+                    break
+            self._commit_insert(table, uncommitted_ids)
+        finally:
+            if opened:
+                self.close()
+        return total
+
+    def _load_data_infile(self, table: str, rows_iter: Iterator[Tuple], chunk_rows: int,
+                          on_batch: Optional[Callable[[int], None]]) -> Tuple[int, Optional[Iterator[Tuple]]]:
+        """Bulk-load rows through temp CSV files.
+
+        Returns the rows loaded and, if local infile turned out to be
+        disabled, an iterator over the rows still to insert (else None).
+        """
+        position = STUDENT_ID_POSITION[table]
+        load_sql = '''
+            LOAD DATA LOCAL INFILE %s INTO TABLE {}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n' ({})
+        '''.format(table, ', '.join(TABLE_COLUMNS[table]))
+        # LOCAL INFILE is MySQL-only, so the connector is already loaded by the backend here
+        import mysql.connector
+        os.makedirs(BULK_LOAD_DIR, exist_ok=True)
+        total = 0
+        # Skip per-row unique and FK checks for the load; always restored on this pooled connection
+        self.cursor.execute("SET unique_checks = 0, foreign_key_checks = 0")
+        try:
+            while True:
+                chunk = list(itertools.islice(rows_iter, chunk_rows))
+                if not chunk:
+                    return total, None
+                with tempfile.NamedTemporaryFile('w', dir=BULK_LOAD_DIR, suffix='.csv',
+                                                 encoding='utf-8', newline='', delete=False) as out:
+                    out.writelines(_csv_line(row) for row in chunk)
+                try:
+                    self.cursor.execute(load_sql, (out.name,))
+                except mysql.connector.Error as exc:
+                    if exc.errno not in LOCAL_INFILE_ERRORS:
+                        raise
+                    self.conn.rollback()
+                    return total, itertools.chain(chunk, rows_iter)
+                finally:
+                    os.remove(out.name)
+                self._commit_insert(table, {row[position] for row in chunk})
+                total += len(chunk)
+                if on_batch:
+                    on_batch(len(chunk))
+        finally:
+            self.cursor.execute("SET unique_checks = 1, foreign_key_checks = 1")
+
+    def _commit_insert(self, table: str, student_ids: Set[int]):
+        if not student_ids:
+            self.conn.commit()
+            return
+        # New students have no child rows yet, so only child-table inserts move the summaries
+        if table != 'students':
+            apply_delta(self.cursor, [table], student_ids)
+        # Bulk loads are not logged per student; other processes reload the table instead
+        watermark = self._advance_watermark(table, None)
+        self.conn.commit()
+        self._after_write(table, student_ids, watermark)
+
+    def _after_write(self, table: str, student_ids: Set[int], watermark: int):
+        self.cache.invalidate([table] + [summary.table for summary in summaries_for([table])],
+                              self.backend.key)
+        self._mark_seen(table, watermark)
+        if student_ids:
+            _notify_write(table, student_ids)
+
+    def upsert_data(self, table: str, data: Iterable[Tuple], columns: Optional[List[str]] = None,
+                    batch_size: Optional[int] = None) -> int:
+        """Insert or update rows keyed by student_id and return the number of rows sent.
+
+        `columns` names the values in each row (default: every column in
+        TABLE_COLUMNS[table]) and must include student_id. With every column,
+        existing students are overwritten and new ones inserted through
+        INSERT ... ON DUPLICATE KEY UPDATE. A child table's own id
+        (programming_id, soft_skill_id, placement_id) and a student's email
+        must be new or already belong to the row's student: MySQL fires the
+        update on whichever unique key matches, so a reused value would
+        overwrite another student's row, and such a batch is rejected with
+        ValueError. With a subset, only students that
+        already have a row are updated, since an INSERT would need every NOT
+        NULL column (MySQL and SQLite check them before the key). Each batch of
+        `batch_size` rows (default UPSERT_BATCH_SIZE) is one transaction that
+        also moves the summary tables and logs the students under a new
+        watermark for the table, so caches, the columnar engine and other
+        processes (see sync_changes) refresh only those students.
+        """
+        columns = list(columns or TABLE_COLUMNS[table])
+        unknown = set(columns) - set(TABLE_COLUMNS[table])
+        if unknown or 'student_id' not in columns:
+            raise ValueError(f"upsert_data({table!r}) needs student_id and known columns, got {columns}")
+        key = TABLE_COLUMNS[table][0]
+        keys = {key, 'student_id'}
+        values = [column for column in columns if column not in keys]
+        position = columns.index('student_id')
+        # Unique columns whose values may not move to another student
+        owned = [column for column in UNIQUE_COLUMNS.get(table, []) if column in columns]
+        if set(TABLE_COLUMNS[table]) <= set(columns):
+            if key != 'student_id':
+                owned.append(key)
+            statement = 'INSERT INTO {} ({}) VALUES ({}) {} {}'.format(
+                table, ', '.join(columns), ', '.join(['%s'] * len(columns)), self.backend.upsert_clause('student_id'),
+                ', '.join(f'{column} = VALUES({column})' for column in values))
+            arrange = None
+        else:
+            if not values:
+                raise ValueError(f"upsert_data({table!r}) has no columns to update")
+            statement = 'UPDATE {} SET {} WHERE student_id = %s'.format(
+                table, ', '.join(f'{column} = %s' for column in values))
+            indexes = [columns.index(column) for column in values] + [position]
+            arrange = lambda row: tuple(row[i] for i in indexes)
+
+        opened = self.conn is None
+        self.connect()
+        rows_iter = iter(data)
+        total = 0
+        try:
+            while True:
+                batch = list(itertools.islice(rows_iter, batch_size or UPSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                student_ids = {row[position] for row in batch}
+                try:
+                    for column in owned:
+                        self._check_row_owners(table, column, batch, columns.index(column), position)
+                    # Take the students' old rows out of the summaries, write, then add the new rows back
+                    removed = apply_delta(self.cursor, [table], student_ids, -1)
+                    self.cursor.executemany(statement, batch if arrange is None else [arrange(row) for row in batch])
+                    apply_delta(self.cursor, [table], student_ids, 1, removed)
+                    watermark = self._advance_watermark(table, student_ids)
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
+                self._after_write(table, student_ids, watermark)
+                total += len(batch)
+        finally:
+            if opened:
+                self.close()
+        return total
+
+    def _check_row_owners(self, table: str, key: str, batch: List[Tuple], owned: int, position: int):
+        """Raise ValueError if a batch gives a unique `key` value (a child row id or an
+        email) to a second student, within the batch or against the rows already stored"""
+        owners: Dict[object, int] = {}
+        for row in batch:
+            # NULL never matches a unique key
+            if row[owned] is not None and owners.setdefault(row[owned], row[position]) != row[position]:
+                raise ValueError(f"upsert_data({table!r}): {key} {row[owned]} is given to students "
+                                 f"{owners[row[owned]]} and {row[position]}")
+        ids = list(owners)
+        for start in range(0, len(ids), ID_CHUNK):
+            chunk = ids[start:start + ID_CHUNK]
+            self.cursor.execute('SELECT {0}, student_id FROM {1} WHERE {0} IN ({2})'.format(
+                key, table, ', '.join(['%s'] * len(chunk))), chunk)
+            for row_id, student_id in self.cursor.fetchall():
+                if student_id != owners[row_id]:
+                    raise ValueError(f"upsert_data({table!r}): {key} {row_id} belongs to student {student_id}, "
+                                     f"not {owners[row_id]}")
+
+    def _advance_watermark(self, table: str, student_ids: Optional[Set[int]]) -> int:
+        """Bump the table's watermark inside the current transaction and log the students
+        written under it (None: a bulk write, consumers reload the whole table)"""
+        self.cursor.execute('''
+            INSERT INTO table_watermarks (table_name, watermark, reset_at) VALUES (%s, 1, 0)
+            ON DUPLICATE KEY UPDATE watermark = watermark + 1
+        ''', (table,))
+        self.cursor.execute("SELECT watermark FROM table_watermarks WHERE table_name = %s", (table,))
+        watermark = self.cursor.fetchall()[0][0]
+        if student_ids is None:
+            self.cursor.execute("UPDATE table_watermarks SET reset_at = watermark WHERE table_name = %s", (table,))
+        else:
+            self.cursor.executemany("INSERT INTO change_log (table_name, watermark, student_id) VALUES (%s, %s, %s)",
+                                    [(table, watermark, student_id) for student_id in sorted(student_ids)])
+            if watermark > CHANGE_LOG_KEEP and watermark % 100 == 0:
+                # Trim old history now and then; consumers that far behind reload fully
+                horizon = watermark - CHANGE_LOG_KEEP
+                self.cursor.execute("DELETE FROM change_log WHERE table_name = %s AND watermark <= %s",
+                                    (table, horizon))
+                self.cursor.execute("UPDATE table_watermarks SET reset_at = GREATEST(reset_at, %s) "
+                                    "WHERE table_name = %s", (horizon, table))
+        return watermark
+
+    def _mark_seen(self, table: str, watermark: int):
+        # This process applied its own write; skip it in sync_changes unless another process wrote in between
+        key = (self.backend.key, table)
+        with _watermark_lock:
+            if _seen_watermarks.get(key) == watermark - 1:
+                _seen_watermarks[key] = watermark
+
+    def watermarks(self) -> Dict[str, Tuple[int, int]]:
+        """(watermark, reset_at) per table that has been written"""
+        rows = self.execute_query("SELECT table_name, watermark, reset_at FROM table_watermarks", use_cache=False)
+        return {table: (watermark, reset_at) for table, watermark, reset_at in rows}
+
+    def changes_since(self, table: str, watermark: int) -> Optional[Set[int]]:
+        """Students written to `table` after `watermark`, or None when that history is
+        not available (bulk writes or trimmed log) and the whole table must be reloaded"""
+        current, reset_at = self.watermarks().get(table, (0, 0))
+        if watermark < reset_at:
+            return None
+        rows = self.execute_query("SELECT DISTINCT student_id FROM change_log WHERE table_name = %s "
+                                  "AND watermark > %s AND watermark <= %s", (table, watermark, current),
+                                  use_cache=False)
+        return {row[0] for row in rows}
+
+    def sync_changes(self) -> Dict[str, Optional[Set[int]]]:
+        """Apply writes committed by other processes since this process last looked:
+        invalidate the cached queries of each changed table and pass the changed
+        students (None: reload everything) to the write listeners. Returns what was applied."""
+        if self.backend.read_only:
+            return {}
+        applied = {}
+        for table, (watermark, reset_at) in self.watermarks().items():
+            key = (self.backend.key, table)
+            with _watermark_lock:
+                seen = _seen_watermarks.get(key)
+                _seen_watermarks[key] = max(seen or 0, watermark)
+            # The first look only records the position; nothing was loaded from before it
+            if seen is None or watermark <= seen:
+                continue
+            student_ids = None if seen < reset_at else self.changes_since(table, seen)
+            self.cache.invalidate([table] + [summary.table for summary in summaries_for([table])],
+                                  self.backend.key)
+            _notify_write(table, student_ids)
+            applied[table] = student_ids
+        return applied
+
+    def shared_key(self, query: str, params: tuple = ()) -> Optional[str]:
+        """Shared-cache key for a SELECT over base and summary tables: the query plus the
+        change watermark this process has applied for every base table it depends on"""
+        if self.shared is None:
+            return None
+        sources = set()
+        for table in tables_in(query):
+            if table in _SUMMARY_SOURCES:
+                sources.update(_SUMMARY_SOURCES[table])
+            elif table in DATA_TABLES:
+                sources.add(table)
+            else:
+                return None
+        with _watermark_lock:
+            version = [_seen_watermarks.get((self.backend.key, table)) for table in sorted(sources)]
+        # Before the first sync_changes() this process has no version to share under
+        if not sources or None in version:
+            return None
+        return cache_key(self.backend.key, normalize_query(query), list(params), sorted(sources), version)
+
+    def execute_query(self, query: str, params: tuple = (), use_cache: bool = True) -> List[Tuple]:
+        """Execute SQL query and return results, serving repeated SELECTs from the shared cache"""
+        cacheable = use_cache and _is_select(query)
+        if not cacheable:
+            return self._fetch(query, params)
+        rows = self.cache.get(query, params, self.backend.key)
+        if rows is not None:
+            return rows
+        generation = self.cache.generation(query, self.backend.key)
+        key = self.shared_key(query, params)
+        if key is None:
+            rows = self._fetch(query, params)
+        else:
+            rows = self.shared.rows(key, lambda: self._fetch(query, params))
+        self.cache.put(query, params, rows, generation, self.backend.key)
+        return rows
+
+    def _fetch(self, query: str, params: tuple) -> List[Tuple]:
+        if self.conn is not None:
+            return self._fetch_on(self.conn, self.cursor, query, params)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                return self._fetch_on(conn, cursor, query, params)
+            finally:
+                cursor.close()
+
+    def _fetch_on(self, conn, cursor, query: str, params: tuple) -> List[Tuple]:
+        """Run and record a query; a slow one is EXPLAINed on the same connection"""
+        start = time.perf_counter()
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        except Exception as exc:
+            self._record(query, params, time.perf_counter() - start, error=exc, conn=conn)
+            raise
+        self._record(query, params, time.perf_counter() - start, rows, conn=conn)
+        return rows
+
+    def execute_batch(self, queries: List[str]) -> List[List[Tuple]]:
+        """Execute several parameterless SELECTs in one round trip and return each result set"""
+        results = [self.cache.get(query, (), self.backend.key) for query in queries]
+        generations = [self.cache.generation(query, self.backend.key) for query in queries]
+        # Results another process already computed; the rest still go in one round trip
+        keys = [self.shared_key(query) if rows is None else None for query, rows in zip(queries, results)]
+        for i, key in enumerate(keys):
+            if key is not None:
+                results[i] = self.shared.get_rows(key)
+                if results[i] is not None:
+                    self.cache.put(queries[i], (), results[i], generations[i], self.backend.key)
+        missing = [i for i, rows in enumerate(results) if rows is None]
+        if not missing:
+            return results
+
+        pending = [queries[i] for i in missing]
+        if self.conn is None:
+            with self.connection() as conn:
+                fetched = self._fetch_batch(conn, pending)
+        else:
+            fetched = self._fetch_batch(self.conn, pending)
+
+        for i, query, rows in zip(missing, pending, fetched):
+            self.cache.put(query, (), rows, generations[i], self.backend.key)
+            if keys[i] is not None:
+                self.shared.put_rows(keys[i], rows)
+            results[i] = rows
+        return results
+
+    def execute_concurrent(self, queries: List[str], timeout: Optional[float] = None) -> List[QueryResult]:
+        """Run independent parameterless SELECTs at once, each on its own pooled connection.
+
+        Results are returned in query order. A query that raises or is still
+        running `timeout` seconds after the fan-out started gets a QueryResult
+        with `error` set; the other results are unaffected.
+        """
+        results: List[Optional[QueryResult]] = [None] * len(queries)
+        pending = {}
+        executor = get_query_executor()
+        for i, query in enumerate(queries):
+            rows = self.cache.get(query, (), self.backend.key)
+            if rows is not None:
+                results[i] = QueryResult(rows)
+            else:
+                pending[executor.submit(self._execute_isolated, query, timeout)] = i
+
+        deadline = time.monotonic() + timeout if timeout else None
+        for future, i in pending.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results[i] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # The worker keeps its connection until the query (or the server-side limit) ends
+                results[i] = QueryResult(None, QueryTimeoutError(f"Query did not finish within {timeout}s"), timeout)
+        return results
+
+    def _execute_isolated(self, query: str, timeout: Optional[float]) -> QueryResult:
+        start = time.perf_counter()
+        try:
+            generation = self.cache.generation(query, self.backend.key)
+            key = self.shared_key(query)
+            if key is None:
+                rows = self._fetch_isolated(query, timeout)
+            else:
+                # Only one process runs it; the others wait for its result (never past the timeout)
+                rows = self.shared.rows(key, lambda: self._fetch_isolated(query, timeout), timeout)
+            self.cache.put(query, (), rows, generation, self.backend.key)
+            result = QueryResult(rows, None, time.perf_counter() - start)
+        except Exception as exc:
+            result = QueryResult(None, exc, time.perf_counter() - start)
+            self._record(query, (), result.seconds, error=exc)
+        return result
+
+    def _fetch_isolated(self, query: str, timeout: Optional[float]) -> List[Tuple]:
+        start = time.perf_counter()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if timeout:
+                    self.backend.set_statement_timeout(cursor, timeout)
+                try:
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                finally:
+                    if timeout:
+                        self.backend.set_statement_timeout(cursor, None)
+            finally:
+                cursor.close()
+            self._record(query, (), time.perf_counter() - start, rows, conn=conn)
+        return rows
+
+    def _fetch_batch(self, conn, queries: List[str]) -> List[List[Tuple]]:
+        start = time.perf_counter()
+        fetched = self._execute_batch(conn, queries)
+        # One round trip serves them all, so each query is charged an equal share
+        seconds = (time.perf_counter() - start) / len(queries)
+        for query, rows in zip(queries, fetched):
+            self._record(query, (), seconds, rows, conn=conn)
+        return fetched
+
+    def _record(self, query: str, params: tuple, seconds: float, rows: Optional[List[Tuple]] = None,
+                error: Optional[BaseException] = None, conn=None):
+        """Add an execution to the query statistics; slow ones are logged with their plan,
+        EXPLAINed on `conn` (the connection that ran them) rather than a second checkout"""
+        if not self.stats.record(query, seconds, rows, error):
+            return
+        plan = None
+        if self.stats.explain_due(query):
+            try:
+                plan = self.explain(query, params, conn)
+            except Exception as exc:
+                plan = [{'error': str(exc)}]
+        self.stats.log_slow(query, params, seconds, len(rows), plan)
 
-    def execute_query(self, query: str, params: tuple = ()) -> List[Tuple]:
-        """Execute SQL query and return results"""
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+    def _execute_batch(self, conn, queries: List[str]) -> List[List[Tuple]]:
+        cursor = conn.cursor()
+        try:
+            if self.backend.multi_statements:
+                import mysql.connector
+                sql = ';\n'.join(query.strip().rstrip(';') for query in queries)
+                try:
+                    # Multi-statement execution: connector >= 9.2 API, then the older multi=True API
+                    try:
+                        cursor.execute(sql, map_results=True)
+                        results = [list(rows) for _, rows in cursor.fetchsets()]
+                    except TypeError:
+                        results = [result.fetchall() for result in cursor.execute(sql, multi=True)]
+                    if len(results) == len(queries):
+                        return results
+                except mysql.connector.Error:
+                    pass
+            # Multi-statements unavailable: fall back to one round trip per query
+            results = []
+            for query in queries:
+                cursor.execute(query)
+                results.append(cursor.fetchall())
+            return results
+        finally:
+            cursor.close()
 
     def close(self):
-        """Close database connection"""
+        """Return the checked-out connection to the pool"""
         if self.conn:
-            self.cursor.close()
-            self.conn.close()
\ No newline at end of file
+            try:
+                if self.cursor:
+                    self.cursor.close()
+            finally:
+                self.pool.release(self.conn)
+                self.conn = None
+                self.cursor = None
@@ -0,0 +1,123 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+# Value sets of the low-cardinality columns, drawn from by data_generator.py;
+# cohort.py dictionary-encodes them in this order
+BATCHES = ['DS_2023', 'DS_2024', 'DS_2025']
+LANGUAGES = ['Python', 'SQL', 'Java']
+CITIES = ['New York', 'San Francisco', 'Boston', 'Chicago', 'Seattle']
+COMPANIES = ['Google', 'Amazon', 'Microsoft', 'Infosys', 'TCS', 'Wipro', 'Accenture', 'Deloitte', 'Capgemini', 'OtherTech']
+PLACEMENT_STATUSES = ['Ready', 'Not Ready', 'Placed']
+
+
+class EligibilityCriteria(NamedTuple):
+    """Slider/multiselect values from the sidebar; defaults match the UI"""
+    min_problems: int = 50
+    min_soft_skills: int = 75
+    min_mock_score: int = 70
+    min_assessments: int = 5
+    min_mini_projects: int = 1
+    batches: Tuple[str, ...] = tuple(BATCHES)
+
+
+# Display names for the columns selected by build_eligibility_query
+ELIGIBLE_COLUMNS = ['Name', 'Email', 'Batch', 'Problems Solved',
+                    'Avg Soft Skills', 'Mock Interview Score',
+                    'Company Name', 'Placement Package', 'Placement Date',
+                    'Assessments Completed', 'Mini Projects']
+
+# Column dtypes for frames.to_frame, aligned with ELIGIBLE_COLUMNS
+ELIGIBLE_DTYPES = ['object', 'object', 'category', 'int16',
+                   'float64', 'uint8',
+                   'category', 'float64', 'datetime64[ns]',
+                   'int16', 'int16']
+
+ELIGIBLE_SELECT = '''
+    SELECT s.name, s.email, s.course_batch, p.problems_solved,
+        ss.avg_soft_skills,
+        pl.mock_interview_score,
+        pl.company_name,
+        pl.placement_package,
+        DATE_FORMAT(pl.placement_date, '%Y-%m-%d') as placement_date,
+        p.assessments_completed,
+        p.mini_projects
+'''
+
+ELIGIBLE_FROM = '''
+    FROM students s
+    JOIN programming p ON s.student_id = p.student_id
+    JOIN soft_skills ss ON s.student_id = ss.student_id
+    JOIN placements pl ON s.student_id = pl.student_id
+'''
+
+
+def eligibility_where(criteria: EligibilityCriteria) -> Tuple[str, List]:
+    """WHERE clause and params for the five thresholds plus the batch filter"""
+    where = '''
+    WHERE p.problems_solved >= %s
+    AND ss.avg_soft_skills >= %s
+    AND pl.mock_interview_score >= %s
+    AND p.assessments_completed >= %s
+    AND p.mini_projects >= %s
+    '''
+    params = [criteria.min_problems, criteria.min_soft_skills, criteria.min_mock_score,
+              criteria.min_assessments, criteria.min_mini_projects]
+
+    # Handle the IN clause dynamically
+    if criteria.batches:
+        where += ' AND s.course_batch IN ({})'.format(','.join(['%s'] * len(criteria.batches)))
+        params.extend(criteria.batches)
+    else:
+        where += ' AND 1=0'  # No results if no batches selected
+    return where, params
+
+
+def build_eligibility_query(criteria: EligibilityCriteria) -> Tuple[str, tuple]:
+    """Full eligibility query and its params"""
+    where, params = eligibility_where(criteria)
+    return ELIGIBLE_SELECT + ELIGIBLE_FROM + where, tuple(params)
+
+
+# Sortable columns for the paginated table: display name -> SQL expression.
+# s.student_id breaks ties so every row has a unique keyset position. Every
+# expression must round-trip exactly through the client, since the last row's
+# value is bound back into the seek: the FLOAT package is read as DOUBLE, which
+# MySQL would otherwise send rounded to six significant digits.
+SORT_COLUMNS = {
+    'Name': 's.name',
+    'Batch': 's.course_batch',
+    'Problems Solved': 'p.problems_solved',
+    'Avg Soft Skills': 'ss.avg_soft_skills',
+    'Mock Interview Score': 'pl.mock_interview_score',
+    'Placement Package': 'CAST(pl.placement_package AS DOUBLE)',
+    'Placement Date': 'pl.placement_date',
+    'Assessments Completed': 'p.assessments_completed',
+    'Mini Projects': 'p.mini_projects',
+}
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def build_count_query(criteria: EligibilityCriteria) -> Tuple[str, tuple]:
+    """COUNT(*) of eligible students for the page total"""
+    where, params = eligibility_where(criteria)
+    return 'SELECT COUNT(*)' + ELIGIBLE_FROM + where, tuple(params)
+
+
+def build_page_query(criteria: EligibilityCriteria, sort_column: str, descending: bool,
+                     page_size: int, after: Optional[Tuple] = None) -> Tuple[str, tuple]:
+    """Keyset-paginated eligibility query.
+
+    `after` is the (sort value, student_id) of the last row on the previous page.
+    Each row carries those two values after the display columns.
+    """
+    column = SORT_COLUMNS[sort_column]
+    where, params = eligibility_where(criteria)
+    if after is not None:
+        op = '<' if descending else '>'
+        where += f' AND ({column} {op} %s OR ({column} = %s AND s.student_id {op} %s))'
+        params.extend([after[0], after[0], after[1]])
+    direction = 'DESC' if descending else 'ASC'
+    query = (ELIGIBLE_SELECT.rstrip() + f', {column}, s.student_id' + ELIGIBLE_FROM + where +
+             f' ORDER BY {column} {direction}, s.student_id {direction} LIMIT %s')
+    params.append(page_size)
+    return query, tuple(params)
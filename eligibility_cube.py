@@ -0,0 +1,289 @@
+"""Precomputed "how many qualify" counts for the eligibility sliders.
+
+A suffix-sum cube over the five threshold dimensions, one slab per batch:
+cell [i1..i5, b] holds the number of students in batch b whose values are at
+least level i of every dimension, so a count for any slider setting is a
+handful of array lookups. It is built from the columnar engine's arrays and
+follows the engine's incremental refreshes with box updates.
+
+Each dimension keeps the distinct values present (exact counts) unless the
+cube would exceed CUBE_MAX_CELLS, in which case the widest dimensions fall back
+to a coarser grid and counts between grid points are lower bounds;
+exact_count() answers those from the engine instead.
+
+Limitation: the lookups are only O(1) on the grid. A cube exact over the
+full slider ranges needs 101 x 101 x 101 x 21 x 6 cells per batch (about
+1.5 GiB for three batches), so on any realistic cohort the three 0-100
+dimensions are coarsened. Most slider settings then fall between grid points,
+and exact_count() scans the engine in O(n). suggest() uses exact counts as
+well: one engine pass per slider whenever the cube cannot answer exactly.
+
+    python eligibility_cube.py --check 200
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from eligibility import EligibilityCriteria
+from eligibility_engine import ColumnarEligibilityEngine, get_eligibility_engine, random_criteria
+
+# (criteria field, engine feature) per cube axis
+CUBE_DIMENSIONS = [
+    ('min_problems', 'problems_solved'),
+    ('min_soft_skills', 'soft_skills_sum'),
+    ('min_mock_score', 'mock_interview_score'),
+    ('min_assessments', 'assessments_completed'),
+    ('min_mini_projects', 'mini_projects'),
+]
+
+# Grid steps tried, in order, for a dimension that has to be coarsened
+GRID_STEPS = [1, 2, 5, 10, 20, 25, 50]
+
+# Cells (4 bytes each) the cube may use before dimensions are coarsened
+CUBE_MAX_CELLS = int(os.getenv('CUBE_MAX_CELLS', str(16_000_000)))
+
+# Changed students applied as box updates; larger changes rebuild the cube
+CUBE_INCREMENTAL_MAX = 2000
+
+
+def _slider_values(feature: str, values: np.ndarray) -> np.ndarray:
+    """Feature values in slider units; a soft-skills sum passes threshold t iff sum // 3 >= t"""
+    values = values.astype(np.int64)
+    return values // 3 if feature == 'soft_skills_sum' else values
+
+
+def _levels(values: np.ndarray, step: int) -> np.ndarray:
+    """Thresholds kept on one axis; 0 is always present so every student lands in a bin"""
+    if values.size == 0:
+        return np.zeros(1, dtype=np.int64)
+    if step == 1:
+        levels = np.unique(values)
+    else:
+        low, high = int(values.min()), int(values.max())
+        levels = np.arange(-(-low // step) * step, high + 1, step)
+    return np.union1d(np.zeros(1, dtype=np.int64), levels)
+
+
+class EligibilityCube:
+    """Suffix-sum count cube over the five thresholds with one slab per batch"""
+
+    def __init__(self, engine: ColumnarEligibilityEngine, max_cells: int = CUBE_MAX_CELLS):
+        self.engine = engine
+        self.max_cells = max_cells
+        self.levels: List[np.ndarray] = []
+        self.steps: List[int] = []
+        self.maxima: List[int] = []
+        self.batch_lookup: Dict[str, int] = {}
+        self.counts = np.zeros(0, dtype=np.uint32)
+        self.student_ids = np.empty(0, dtype=np.int64)
+        self.cells = np.empty(0, dtype=np.int64)   # flat cell per student, -1 when not counted
+        self.version = None
+        self._lock = threading.RLock()
+
+    # -- building ----------------------------------------------------------
+
+    def _cells(self, snapshot: Dict, shape: tuple) -> Tuple[np.ndarray, List[np.ndarray]]:
+        values = [_slider_values(feature, snapshot['features'][feature]) for _, feature in CUBE_DIMENSIONS]
+        bins = [np.searchsorted(levels, column, side='right') - 1 for levels, column in zip(self.levels, values)]
+        batches = snapshot['batch_codes'].astype(np.int64)
+        included = snapshot['valid'] & (batches >= 0)
+        cells = np.full(len(batches), -1, dtype=np.int64)
+        if included.any():
+            cells[included] = np.ravel_multi_index(
+                [column[included] for column in bins] + [batches[included]], shape)
+        return cells, values
+
+    def build(self, snapshot: Optional[Dict] = None):
+        """Recompute the cube from the engine's current columns"""
+        with self._lock:
+            snapshot = snapshot or self.engine.snapshot()
+            values = [_slider_values(feature, snapshot['features'][feature]) for _, feature in CUBE_DIMENSIONS]
+            batches = max(1, len(snapshot['batch_lookup']))
+            self.steps = [1] * len(CUBE_DIMENSIONS)
+            self.levels = [_levels(column, 1) for column in values]
+            while np.prod([len(levels) for levels in self.levels]) * batches > self.max_cells:
+                coarsenable = [d for d in range(len(self.levels)) if self.steps[d] != GRID_STEPS[-1]]
+                if not coarsenable:
+                    break
+                d = max(coarsenable, key=lambda d: len(self.levels[d]))
+                self.steps[d] = GRID_STEPS[GRID_STEPS.index(self.steps[d]) + 1]
+                self.levels[d] = _levels(values[d], self.steps[d])
+            self.maxima = [int(column.max()) if column.size else 0 for column in values]
+            self.batch_lookup = snapshot['batch_lookup']
+
+            shape = tuple(len(levels) for levels in self.levels) + (batches,)
+            cells, _ = self._cells(snapshot, shape)
+            histogram = np.bincount(cells[cells >= 0], minlength=int(np.prod(shape))).astype(np.uint32)
+            counts = histogram.reshape(shape)
+            for axis in range(len(CUBE_DIMENSIONS)):
+                counts = np.flip(np.cumsum(np.flip(counts, axis), axis=axis, dtype=np.uint32), axis)
+            self.counts = np.ascontiguousarray(counts)
+            self.student_ids = snapshot['student_ids'].astype(np.int64)
+            self.cells = cells
+            self.version = snapshot['version']
+
+    def sync(self):
+        """Follow the engine: box-update a few changed students, rebuild otherwise"""
+        with self._lock:
+            snapshot = self.engine.snapshot()
+            if snapshot['version'] == self.version:
+                return
+            if self.version is None or snapshot['batch_lookup'] != self.batch_lookup:
+                self.build(snapshot)
+                return
+
+            cells, values = self._cells(snapshot, self.counts.shape)
+            ids = snapshot['student_ids'].astype(np.int64)
+            positions = np.searchsorted(self.student_ids, ids)
+            found = positions < len(self.student_ids)
+            found[found] &= self.student_ids[positions[found]] == ids[found]
+            previous = np.full(len(ids), -1, dtype=np.int64)
+            previous[found] = self.cells[positions[found]]
+            changed = cells != previous
+            vanished = ~np.isin(self.student_ids, ids) & (self.cells >= 0)
+
+            # New values can move the per-axis maxima or fall between exact levels
+            for d, column in enumerate(values):
+                fresh = column[changed]
+                if fresh.size and (fresh.max() > self.maxima[d] or
+                                   (self.steps[d] == 1 and not np.isin(fresh, self.levels[d]).all())):
+                    self.build(snapshot)
+                    return
+
+            added = cells[changed & (cells >= 0)]
+            removed = np.concatenate([previous[changed & (previous >= 0)], self.cells[vanished]])
+            if len(added) + len(removed) > CUBE_INCREMENTAL_MAX:
+                self.build(snapshot)
+                return
+            for cell in removed:
+                self.counts[self._box(cell)] -= 1
+            for cell in added:
+                self.counts[self._box(cell)] += 1
+            self.student_ids, self.cells, self.version = ids, cells, snapshot['version']
+
+    def _box(self, cell: int) -> tuple:
+        """Cells whose thresholds a student at this cell meets"""
+        *bins, batch = np.unravel_index(int(cell), self.counts.shape)
+        return tuple(slice(0, int(i) + 1) for i in bins) + (int(batch),)
+
+    # -- queries -----------------------------------------------------------
+
+    def _exact(self, d: int, threshold: int) -> bool:
+        """Whether axis d answers this threshold exactly (on a level, or past every value)"""
+        if self.steps[d] == 1 or threshold > self.maxima[d]:
+            return True
+        j = int(np.searchsorted(self.levels[d], threshold, side='left'))
+        return j < len(self.levels[d]) and self.levels[d][j] == threshold
+
+    def count(self, criteria: EligibilityCriteria) -> Tuple[int, bool]:
+        """Students meeting the criteria, and whether that count is exact (else a lower bound)"""
+        with self._lock:
+            index, exact = [], True
+            for d, (field, _) in enumerate(CUBE_DIMENSIONS):
+                threshold = getattr(criteria, field)
+                j = int(np.searchsorted(self.levels[d], threshold, side='left'))
+                exact &= self._exact(d, threshold)
+                if j == len(self.levels[d]):
+                    return 0, exact
+                index.append(j)
+            codes = [self.batch_lookup[batch] for batch in criteria.batches if batch in self.batch_lookup]
+            return int(sum(int(self.counts[tuple(index) + (code,)]) for code in codes)), exact
+
+    def exact_count(self, criteria: EligibilityCriteria) -> int:
+        """count(), with settings between coarse grid points counted by the engine"""
+        count, exact = self.count(criteria)
+        return count if exact else self.engine.count(criteria)
+
+    def suggest(self, criteria: EligibilityCriteria, target: int) -> Dict[str, Optional[int]]:
+        """Per slider, the highest threshold that still leaves at least `target` students
+        with the other sliders unchanged (None when even 0 is not enough), from exact counts"""
+        with self._lock:
+            suggestions = {}
+            for d, (field, feature) in enumerate(CUBE_DIMENSIONS):
+                others_exact = all(self._exact(e, getattr(criteria, other))
+                                   for e, (other, _) in enumerate(CUBE_DIMENSIONS) if e != d)
+                if self.steps[d] == 1 and others_exact:
+                    # Every level of this axis is an exact lookup, and no threshold between levels
+                    # admits more students than the level above it
+                    suggestions[field] = None
+                    for level in self.levels[d][::-1]:
+                        if self.count(criteria._replace(**{field: int(level)}))[0] >= target:
+                            suggestions[field] = int(level)
+                            break
+                else:
+                    suggestions[field] = self._engine_suggestion(criteria, field, feature, target)
+            return suggestions
+
+    def _engine_suggestion(self, criteria: EligibilityCriteria, field: str, feature: str,
+                           target: int) -> Optional[int]:
+        """suggest() for one slider in one engine pass: the target-th largest value among the
+        students meeting the other criteria"""
+        values = _slider_values(feature, self.engine.feature_values(criteria._replace(**{field: 0}), feature))
+        if target <= 0:
+            return int(values.max()) if values.size else 0
+        if values.size < target:
+            return None
+        return int(np.partition(values, values.size - target)[values.size - target])
+
+    def memory_bytes(self) -> int:
+        return self.counts.nbytes + self.cells.nbytes + self.student_ids.nbytes
+
+
+_cube: Optional[EligibilityCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_eligibility_cube() -> EligibilityCube:
+    """Process-wide cube over the process-wide engine, synced before use"""
+    global _cube
+    engine = get_eligibility_engine()
+    with _cube_lock:
+        if _cube is None:
+            _cube = EligibilityCube(engine)
+    _cube.sync()
+    return _cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cube counts with the columnar engine")
+    parser.add_argument('--check', type=int, default=100, metavar='N', help="number of random criteria to compare")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    engine = get_eligibility_engine()
+    start = time.perf_counter()
+    cube = get_eligibility_cube()
+    print(f"Built {cube.counts.shape} cube in {time.perf_counter() - start:.2f}s "
+          f"({cube.memory_bytes() / 2 ** 20:.1f} MiB, grid steps {cube.steps})")
+
+    rng = random.Random(args.seed)
+    mismatches = inexact = 0
+    for _ in range(args.check):
+        criteria = random_criteria(rng)
+        count, exact = cube.count(criteria)
+        expected = engine.count(criteria)
+        inexact += not exact
+        if (exact and count != expected) or count > expected or cube.exact_count(criteria) != expected:
+            mismatches += 1
+            print(f"MISMATCH {criteria}: cube {count}, engine {expected}")
+        target = rng.randint(1, max(1, 2 * expected))
+        for field, suggestion in cube.suggest(criteria, target).items():
+            if suggestion is None:
+                valid = engine.count(criteria._replace(**{field: 0})) < target
+            else:
+                valid = (engine.count(criteria._replace(**{field: suggestion})) >= target >
+                         engine.count(criteria._replace(**{field: suggestion + 1})))
+            if not valid:
+                mismatches += 1
+                print(f"MISMATCH suggest {field}={suggestion} for {target} under {criteria}")
+    print(f"{args.check - mismatches}/{args.check} criteria consistent, suggestions included "
+          f"({inexact} lower bounds answered by the engine)")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
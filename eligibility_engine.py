@@ -0,0 +1,194 @@
+"""In-memory columnar eligibility engine.
+
+Answers the five threshold predicates plus the batch filter with vectorized
+boolean masks over the shared compact cohort (cohort.get_cohort_model). The
+feature columns are views of the cohort frame; only the soft-skills sum and the
+validity mask are derived here, again whenever the cohort applies a write.
+
+Enable it in the dashboard with ELIGIBILITY_ENGINE=columnar. To check that it
+returns exactly the same students as the SQL path:
+
+    python eligibility_engine.py --check 200
+"""
+import argparse
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from cohort import CohortModel, column_values, get_cohort_model
+from database import DatabaseManager
+from eligibility import BATCHES, ELIGIBLE_FROM, ELIGIBLE_SELECT, EligibilityCriteria, eligibility_where
+
+# Engine features; soft_skills_sum is communication + teamwork + presentation
+FEATURES = ['problems_solved', 'soft_skills_sum', 'mock_interview_score',
+            'assessments_completed', 'mini_projects']
+
+# Cohort columns behind the features (a NULL in any makes the student ineligible)
+SOURCE_COLUMNS = ['problems_solved', 'communication', 'teamwork', 'presentation', 'mock_interview_score',
+                  'assessments_completed', 'mini_projects']
+
+# Ids per IN (...) when fetching display rows
+ID_CHUNK = 1000
+
+
+def _at_least(values: np.ndarray, threshold: int) -> np.ndarray:
+    """values >= threshold without upcasting the narrow column"""
+    info = np.iinfo(values.dtype)
+    if threshold <= info.min:
+        return np.ones(values.shape, dtype=bool)
+    if threshold > info.max:
+        return np.zeros(values.shape, dtype=bool)
+    return values >= values.dtype.type(threshold)
+
+
+class ColumnarEligibilityEngine:
+    """Vectorized eligibility filter over the shared cohort's columns"""
+
+    def __init__(self, cohort: CohortModel):
+        self.cohort = cohort
+        self.db = cohort.db
+        self.student_ids = np.empty(0, dtype=np.int32)  # sorted
+        self.batch_codes = np.empty(0, dtype=np.int8)   # -1 for NULL
+        self.features: Dict[str, np.ndarray] = {name: np.empty(0, dtype=np.uint8) for name in FEATURES}
+        self.valid = np.empty(0, dtype=bool)             # joined row exists and no NULL features
+        self.batch_lookup: Dict[str, int] = {}
+        self.version = None                              # cohort version the columns come from
+        self._lock = threading.RLock()
+
+    def sync(self):
+        """Re-derive the columns if the cohort's frame was replaced since the last sync"""
+        version, frame = self.cohort.snapshot()
+        with self._lock:
+            if version == self.version:
+                return
+            columns = {name: column_values(frame[name]) for name in SOURCE_COLUMNS}
+            nulls = np.zeros(len(frame), dtype=bool)
+            for name in SOURCE_COLUMNS:
+                if frame[name].hasnans:
+                    nulls |= frame[name].isna().to_numpy()
+            self.student_ids = column_values(frame['student_id'])
+            self.batch_codes = column_values(frame['course_batch'])
+            self.batch_lookup = {batch: code for code, batch in enumerate(frame['course_batch'].cat.categories)}
+            self.features = {
+                'problems_solved': columns['problems_solved'],
+                # avg >= x  <=>  sum >= 3x, exact for the integer slider values
+                'soft_skills_sum': columns['communication'].astype(np.uint16) + columns['teamwork'] +
+                columns['presentation'],
+                'mock_interview_score': columns['mock_interview_score'],
+                'assessments_completed': columns['assessments_completed'],
+                'mini_projects': columns['mini_projects'],
+            }
+            self.valid = ~nulls & (self.batch_codes >= 0)
+            self.version = version
+
+    # -- queries -----------------------------------------------------------
+
+    def mask(self, criteria: EligibilityCriteria) -> np.ndarray:
+        """Boolean mask over student_ids for the thresholds and batch filter"""
+        with self._lock:
+            mask = self.valid.copy()
+            mask &= _at_least(self.features['problems_solved'], criteria.min_problems)
+            mask &= _at_least(self.features['soft_skills_sum'], 3 * criteria.min_soft_skills)
+            mask &= _at_least(self.features['mock_interview_score'], criteria.min_mock_score)
+            mask &= _at_least(self.features['assessments_completed'], criteria.min_assessments)
+            mask &= _at_least(self.features['mini_projects'], criteria.min_mini_projects)
+            codes = [self.batch_lookup[batch] for batch in criteria.batches if batch in self.batch_lookup]
+            mask &= np.isin(self.batch_codes, codes)
+            return mask
+
+    def eligible_ids(self, criteria: EligibilityCriteria) -> np.ndarray:
+        """Sorted student_ids that meet the criteria"""
+        with self._lock:
+            return self.student_ids[self.mask(criteria)]
+
+    def count(self, criteria: EligibilityCriteria) -> int:
+        return int(np.count_nonzero(self.mask(criteria)))
+
+    def feature_values(self, criteria: EligibilityCriteria, feature: str) -> np.ndarray:
+        """One feature's values for the students meeting the criteria"""
+        with self._lock:
+            return self.features[feature][self.mask(criteria)]
+
+    def fetch_rows(self, student_ids) -> List[tuple]:
+        """Eligible-students display rows for the given ids, in id order"""
+        ids = [int(student_id) for student_id in student_ids]
+        rows = []
+        for start in range(0, len(ids), ID_CHUNK):
+            chunk = ids[start:start + ID_CHUNK]
+            rows.extend(self.db.execute_query(
+                ELIGIBLE_SELECT + ELIGIBLE_FROM +
+                ' WHERE s.student_id IN ({}) ORDER BY s.student_id'.format(','.join(['%s'] * len(chunk))),
+                tuple(chunk), use_cache=False))
+        return rows
+
+    def snapshot(self) -> Dict:
+        """Consistent view of the columns; they are replaced on refresh, never modified in place"""
+        with self._lock:
+            return {'version': self.version, 'student_ids': self.student_ids, 'batch_codes': self.batch_codes,
+                    'valid': self.valid, 'features': dict(self.features), 'batch_lookup': dict(self.batch_lookup)}
+
+    def memory_bytes(self) -> int:
+        """Bytes derived here on top of the shared cohort frame"""
+        return self.valid.nbytes + self.features['soft_skills_sum'].nbytes
+
+
+_engine: Optional[ColumnarEligibilityEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_eligibility_engine() -> ColumnarEligibilityEngine:
+    """Process-wide engine over the process-wide cohort, both synced before use"""
+    global _engine
+    cohort = get_cohort_model()
+    with _engine_lock:
+        if _engine is None:
+            _engine = ColumnarEligibilityEngine(cohort)
+    _engine.sync()
+    return _engine
+
+
+def sql_eligible_ids(db: DatabaseManager, criteria: EligibilityCriteria) -> List[int]:
+    """Reference result from the SQL path"""
+    where, params = eligibility_where(criteria)
+    rows = db.execute_query('SELECT s.student_id' + ELIGIBLE_FROM + where + ' ORDER BY s.student_id',
+                            tuple(params), use_cache=False)
+    return [row[0] for row in rows]
+
+
+def random_criteria(rng: random.Random) -> EligibilityCriteria:
+    return EligibilityCriteria(rng.randint(0, 100), rng.randint(0, 100), rng.randint(0, 100),
+                               rng.randint(0, 20), rng.randint(0, 5),
+                               tuple(batch for batch in BATCHES if rng.random() < 0.7))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the columnar engine with the SQL path")
+    parser.add_argument('--check', type=int, default=100, metavar='N', help="number of random criteria to compare")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    start = time.perf_counter()
+    engine = get_eligibility_engine()
+    print(f"Loaded {len(engine.student_ids)} students in {time.perf_counter() - start:.2f}s "
+          f"({engine.cohort.memory_bytes() / 1024:.0f} KiB cohort + {engine.memory_bytes() / 1024:.0f} KiB derived)")
+
+    rng = random.Random(args.seed)
+    engine_time = sql_time = 0.0
+    for criteria in [EligibilityCriteria()] + [random_criteria(rng) for _ in range(args.check)]:
+        start = time.perf_counter()
+        fast = engine.eligible_ids(criteria).tolist()
+        engine_time += time.perf_counter() - start
+        start = time.perf_counter()
+        expected = sql_eligible_ids(db, criteria)
+        sql_time += time.perf_counter() - start
+        if fast != expected:
+            raise SystemExit(f"Mismatch for {criteria}: engine {len(fast)} rows, SQL {len(expected)} rows")
+    runs = args.check + 1
+    print(f"{runs} criteria matched; engine {engine_time / runs * 1000:.2f} ms/query, "
+          f"SQL {sql_time / runs * 1000:.2f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Check that the eligibility query is served from indexes rather than full scans.
+
+Seeds a scratch database (the configured DB_NAME with an ``_explain_check``
+suffix on MySQL, a temp file on SQLite/DuckDB) with the vectorized generator,
+reseeding only when its cohort size differs from --records, prints the EXPLAIN
+plan for the eligibility query and exits non-zero if MySQL plans a full table
+scan (access type ALL) on any of the four tables. The dashboard's database and
+its seed marker are never touched unless --in-place is given, and even then it
+is only seeded when empty:
+
+    python explain_check.py
+    python explain_check.py --records 1000000 --min-problems 90 --batches DS_2024
+"""
+import argparse
+import os
+import sys
+import tempfile
+from backends import DuckDBBackend, MySQLBackend, SQLiteBackend
+from database import DatabaseManager
+from eligibility import BATCHES, EligibilityCriteria, build_eligibility_query
+from seed import seed_database
+
+PLAN_COLUMNS = ['table', 'type', 'key', 'rows', 'filtered', 'Extra']
+
+# Appended to DB_NAME (MySQL) or used as the file name (SQLite/DuckDB) of the scratch database
+SCRATCH_NAME = 'placement_explain_check'
+
+
+def full_scans(plan):
+    """Plan rows that read a whole table"""
+    return [row for row in plan if row.get('type') == 'ALL']
+
+
+def scratch_database() -> DatabaseManager:
+    """Manager for a scratch database next to the configured one, created if missing"""
+    config = DatabaseManager().config
+    name = os.getenv('DB_BACKEND', 'mysql').lower()
+    if name == 'sqlite':
+        return DatabaseManager(backend=SQLiteBackend(os.path.join(tempfile.gettempdir(), SCRATCH_NAME + '.db')))
+    if name == 'duckdb':
+        return DatabaseManager(backend=DuckDBBackend(os.path.join(tempfile.gettempdir(), SCRATCH_NAME + '.duckdb')))
+    import mysql.connector
+    database = config['database'] + '_explain_check'
+    server = mysql.connector.connect(**{key: value for key, value in config.items() if key != 'database'})
+    try:
+        server.cursor().execute(f'CREATE DATABASE IF NOT EXISTS `{database}`')
+    finally:
+        server.close()
+    return DatabaseManager(backend=MySQLBackend(dict(config, database=database)))
+
+
+def main():
+    defaults = EligibilityCriteria()
+    parser = argparse.ArgumentParser(description="EXPLAIN the eligibility query")
+    parser.add_argument('--records', type=int, default=100_000, help="students in the scratch database")
+    parser.add_argument('--in-place', action='store_true',
+                        help="EXPLAIN against the configured database instead of a scratch copy")
+    parser.add_argument('--min-problems', type=int, default=defaults.min_problems)
+    parser.add_argument('--min-soft-skills', type=int, default=defaults.min_soft_skills)
+    parser.add_argument('--min-mock-score', type=int, default=defaults.min_mock_score)
+    parser.add_argument('--min-assessments', type=int, default=defaults.min_assessments)
+    parser.add_argument('--min-mini-projects', type=int, default=defaults.min_mini_projects)
+    parser.add_argument('--batches', nargs='*', default=BATCHES)
+    args = parser.parse_args()
+
+    db = DatabaseManager() if args.in_place else scratch_database()
+    db.create_tables()
+    students = db.execute_query("SELECT COUNT(*) FROM students", use_cache=False)[0][0]
+    if args.in_place:
+        seed_database(db)
+    elif students != args.records:
+        from data_generator import BulkDataGenerator
+        seed_database(db, args.records, force=True, generator=BulkDataGenerator(args.records))
+    students = db.execute_query("SELECT COUNT(*) FROM students", use_cache=False)[0][0]
+
+    criteria = EligibilityCriteria(args.min_problems, args.min_soft_skills, args.min_mock_score,
+                                   args.min_assessments, args.min_mini_projects, tuple(args.batches))
+    query, params = build_eligibility_query(criteria)
+    plan = db.explain(query, params)
+
+    print(' | '.join(PLAN_COLUMNS))
+    for row in plan:
+        print(' | '.join(str(row.get(column)) for column in PLAN_COLUMNS))
+
+    scans = full_scans(plan)
+    if scans:
+        print(f"FAIL: full table scan on {', '.join(row['table'] for row in scans)}")
+        sys.exit(1)
+    print(f"OK: no full table scans at {students} students")
+
+
+if __name__ == '__main__':
+    main()
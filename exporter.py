@@ -0,0 +1,121 @@
+"""Streaming export of shortlisted (eligible) students to CSV or Parquet.
+
+Rows are read from an unbuffered server-side cursor in fixed-size chunks and
+written out as they arrive, so memory use is bounded by the chunk size rather
+than by the number of eligible students:
+
+    python exporter.py --output shortlist.csv
+    python exporter.py --output shortlist.parquet --min-problems 80 --batches DS_2024
+"""
+import argparse
+import csv
+import io
+import resource
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from database import DatabaseManager
+from eligibility import BATCHES, ELIGIBLE_COLUMNS, EligibilityCriteria, build_eligibility_query
+
+CHUNK_SIZE = 10000
+FORMATS = ['csv', 'parquet']
+
+
+def iter_eligible_chunks(db: DatabaseManager, criteria: EligibilityCriteria,
+                         chunk_size: int = CHUNK_SIZE) -> Iterator[List[Tuple]]:
+    """Yield eligible-student rows in chunks from an unbuffered cursor"""
+    query, params = build_eligibility_query(criteria)
+    with db.connection() as conn:
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def limit_rows(chunks: Iterator[List[Tuple]], max_rows: int) -> Iterator[List[Tuple]]:
+    """Pass chunks through until max_rows rows have been yielded"""
+    remaining = max_rows
+    for rows in chunks:
+        if remaining <= 0:
+            break
+        yield rows[:remaining]
+        remaining -= len(rows)
+
+
+def write_csv(chunks: Iterator[List[Tuple]], out: BinaryIO) -> int:
+    """Write chunks as UTF-8 CSV with a header row; returns rows written"""
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(ELIGIBLE_COLUMNS)
+    count = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        count += len(rows)
+    text.detach()
+    return count
+
+
+def write_parquet(chunks: Iterator[List[Tuple]], out: BinaryIO) -> int:
+    """Write chunks as Parquet row groups; returns rows written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = [pa.string(), pa.string(), pa.string(), pa.int32(), pa.float64(), pa.int32(),
+             pa.string(), pa.float64(), pa.string(), pa.int32(), pa.int32()]
+    schema = pa.schema(list(zip(ELIGIBLE_COLUMNS, types)))
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            arrays = []
+            for values, field in zip(columns, schema):
+                if pa.types.is_floating(field.type):
+                    values = [float(value) if value is not None else None for value in values]
+                arrays.append(pa.array(values, type=field.type))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+
+def export_eligible(db: DatabaseManager, criteria: EligibilityCriteria, out: BinaryIO,
+                    fmt: str = 'csv', chunk_size: int = CHUNK_SIZE, max_rows: Optional[int] = None) -> int:
+    """Stream the eligible students for criteria (the first max_rows, if given) into a binary file object"""
+    chunks = iter_eligible_chunks(db, criteria, chunk_size)
+    if max_rows is not None:
+        chunks = limit_rows(chunks, max_rows)
+    if fmt == 'csv':
+        return write_csv(chunks, out)
+    if fmt == 'parquet':
+        return write_parquet(chunks, out)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def main():
+    defaults = EligibilityCriteria()
+    parser = argparse.ArgumentParser(description="Export eligible students")
+    parser.add_argument('--output', required=True, help="destination file (.csv or .parquet)")
+    parser.add_argument('--format', choices=FORMATS, help="defaults to the output file extension")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--min-problems', type=int, default=defaults.min_problems)
+    parser.add_argument('--min-soft-skills', type=int, default=defaults.min_soft_skills)
+    parser.add_argument('--min-mock-score', type=int, default=defaults.min_mock_score)
+    parser.add_argument('--min-assessments', type=int, default=defaults.min_assessments)
+    parser.add_argument('--min-mini-projects', type=int, default=defaults.min_mini_projects)
+    parser.add_argument('--batches', nargs='*', default=BATCHES)
+    args = parser.parse_args()
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    criteria = EligibilityCriteria(args.min_problems, args.min_soft_skills, args.min_mock_score,
+                                   args.min_assessments, args.min_mini_projects, tuple(args.batches))
+    with open(args.output, 'wb') as out:
+        count = export_eligible(DatabaseManager(), criteria, out, fmt, args.chunk_size)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Exported {count} students to {args.output} ({fmt}); peak RSS {peak_mb:.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
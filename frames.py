@@ -0,0 +1,52 @@
+"""Query results to typed DataFrames.
+
+The connector returns rows of Python objects (Decimal for DECIMAL/AVG columns,
+date or ISO strings for dates). to_frame transposes them once and builds each
+column directly in its final dtype, so numbers stay numeric (and charts sort
+and scale numerically) and repeated labels are stored once as categories.
+Display formatting belongs in st.column_config, not in the data.
+"""
+from operator import itemgetter
+from typing import List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+def categorical(values: List, vocabulary: Sequence[str] = ()) -> pd.Categorical:
+    """Dictionary-encode values; labels in `vocabulary` keep its order and codes, unseen ones are appended"""
+    values = np.array(values, dtype=object)
+    if not vocabulary:
+        return pd.Categorical(values)
+    extra = sorted(set(pd.unique(values[pd.notna(values)])) - set(vocabulary))
+    return pd.Categorical(values, categories=list(vocabulary) + extra)
+
+
+def _column(values: List, dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return categorical(values, list(dtype.categories))
+    if dtype == 'category':
+        return categorical(values)
+    if dtype in ('float64', 'float32'):
+        if None in values:
+            # NULLs become NaN
+            return np.array(values, dtype=dtype)
+        # Decimal converts element-wise; float() per value beats numpy's object conversion
+        return np.fromiter(map(float, values), dtype=dtype, count=len(values))
+    if dtype.startswith(('int', 'uint')):
+        if None in values:
+            # Nullable extension dtype: int16 -> Int16, uint8 -> UInt8
+            return pd.array(values, dtype=dtype.replace('uint', 'UInt').replace('int', 'Int'))
+        return np.fromiter(values, dtype=dtype, count=len(values))
+    if dtype == 'datetime64[ns]':
+        return pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', errors='coerce').to_numpy()
+    return np.array(values, dtype=object)
+
+
+def to_frame(rows: Sequence[Tuple], columns: List[str], dtypes: List[str]) -> pd.DataFrame:
+    """DataFrame with one column per name, each built directly in the matching dtype
+    ('float64'/'float32', NumPy integer names such as 'int16' or 'uint8' (nullable when NULLs
+    are present), 'category' or a CategoricalDtype vocabulary, 'datetime64[ns]' or 'object'). Extra trailing values in the rows are ignored."""
+    if not rows:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in zip(columns, dtypes)})
+    return pd.DataFrame({name: _column(list(map(itemgetter(i), rows)), dtype)
+                         for i, (name, dtype) in enumerate(zip(columns, dtypes))})
@@ -0,0 +1,51 @@
+"""Delta ingest of changed rows from a CSV file.
+
+The header row names the columns (student_id plus any columns of the table);
+empty cells are NULL and id columns are read as integers; other values are
+passed as text for the database to convert. Rows are upserted in batches through
+DatabaseManager.upsert_data, so only the listed students are rewritten and the
+summary tables, caches and columnar engine follow incrementally:
+
+    python ingest.py programming problems_update.csv
+    python ingest.py placements mock_results.csv --batch-size 500
+"""
+import argparse
+import csv
+import time
+from typing import Iterator, List, Tuple
+from database import DatabaseManager, TABLE_COLUMNS
+
+
+def read_rows(path: str) -> Tuple[List[str], Iterator[Tuple]]:
+    """Column names from the header and the remaining rows, empty cells as None"""
+    source = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(source)
+    columns = [column.strip() for column in next(reader)]
+    ids = [column.endswith('_id') for column in columns]
+
+    def rows():
+        with source:
+            for row in reader:
+                yield tuple(None if value == '' else int(value) if is_id else value
+                            for value, is_id in zip(row, ids))
+    return columns, rows()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upsert changed rows from a CSV file")
+    parser.add_argument('table', choices=list(TABLE_COLUMNS))
+    parser.add_argument('path')
+    parser.add_argument('--batch-size', type=int, help="rows per transaction (default UPSERT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    db.create_tables()
+    columns, rows = read_rows(args.path)
+    start = time.perf_counter()
+    count = db.upsert_data(args.table, rows, columns=columns, batch_size=args.batch_size)
+    watermark, _ = db.watermarks().get(args.table, (0, 0))
+    print(f"Upserted {count} {args.table} rows in {time.perf_counter() - start:.2f}s (watermark {watermark})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from database import DatabaseManager, QueryResult
+
+# Rows shown in the "top N" charts; tables show the full result set
+TOP_N = 5
+
+# 'concurrent' runs each query on its own pooled connection at the same time;
+# 'batch' sends them all as one multi-statement round trip
+INSIGHT_EXECUTION = os.getenv('INSIGHT_EXECUTION', 'concurrent')
+
+# Seconds before a concurrent insight query is reported as failed
+INSIGHT_QUERY_TIMEOUT = float(os.getenv('INSIGHT_QUERY_TIMEOUT', '10'))
+
+# One query per insight. Insights that show a top-N chart next to a full table
+# fetch the full ordered result once and take the chart slice from its head.
+# The grouped insights (1, 5, 7, 8, 10) read the maintained tables in summaries.py.
+INSIGHT_QUERIES = {
+    # Query 1: Average programming performance by batch
+    'avg_problems_by_batch': '''
+        SELECT course_batch, problem_sum * 1.0 / problem_count
+        FROM summary_batch_problems
+        WHERE problem_count > 0
+        ORDER BY course_batch
+    ''',
+    # Query 2: Students ready for placement
+    'ready_students': '''
+        SELECT s.name, p.latest_project_score, pl.mock_interview_score
+        FROM students s
+        JOIN programming p ON s.student_id = p.student_id
+        JOIN placements pl ON s.student_id = pl.student_id
+        WHERE pl.placement_status = 'Ready'
+        ORDER BY p.latest_project_score DESC, pl.mock_interview_score DESC
+    ''',
+    # Query 3: Soft skills distribution
+    'communication_distribution': '''
+        SELECT CASE
+            WHEN communication >= 90 THEN '90-100'
+            WHEN communication >= 80 THEN '80-89'
+            WHEN communication >= 70 THEN '70-79'
+            ELSE 'Below 70'
+        END as score_range, COUNT(*) as count
+        FROM soft_skills
+        GROUP BY score_range
+    ''',
+    # Query 4: Students with multiple internships
+    'multiple_internships': '''
+        SELECT s.name, pl.internships_completed
+        FROM students s
+        JOIN placements pl ON s.student_id = pl.student_id
+        WHERE pl.internships_completed > 1
+        ORDER BY pl.internships_completed DESC
+    ''',
+    # Query 5: Average placement package by city
+    'avg_package_by_city': '''
+        SELECT city, package_sum / placed_count as avg_package
+        FROM summary_city_packages
+        WHERE placed_count > 0
+        ORDER BY city
+    ''',
+    # Query 6: Students with high soft skills scores
+    'high_soft_skills': '''
+        SELECT s.name, AVG(ss.communication + ss.teamwork + ss.presentation) as avg_soft_skills
+        FROM students s
+        JOIN soft_skills ss ON s.student_id = ss.student_id
+        GROUP BY s.student_id, s.name
+        HAVING AVG(ss.communication + ss.teamwork + ss.presentation) > 85
+        ORDER BY avg_soft_skills DESC
+    ''',
+    # Query 7: Programming language preference
+    'language_preference': '''
+        SELECT language, student_count
+        FROM summary_language_counts
+        WHERE student_count > 0
+        ORDER BY language
+    ''',
+    # Query 8: Placement success rate by batch
+    'success_rate_by_batch': '''
+        SELECT course_batch, placed_count * 100.0 / total_count as success_rate
+        FROM summary_batch_placements
+        WHERE total_count > 0
+        ORDER BY course_batch
+    ''',
+    # Query 9: Students with certifications
+    'certified_students': '''
+        SELECT s.name, p.certifications_earned
+        FROM students s
+        JOIN programming p ON s.student_id = p.student_id
+        WHERE p.certifications_earned > 0
+        ORDER BY p.certifications_earned DESC
+    ''',
+    # Query 10: Recent placements
+    'recent_placements': '''
+        SELECT company_name, placed_count as placement_count
+        FROM summary_company_placements
+        WHERE placed_count > 0
+        ORDER BY latest_placement_date DESC, company_name
+        LIMIT 10
+    ''',
+}
+
+
+def fetch_insights(db: DatabaseManager, mode: Optional[str] = None, timeout: Optional[float] = None,
+                   keys: Optional[List[str]] = None) -> Dict[str, QueryResult]:
+    """Run the insight queries (all of them, or just `keys`) once and return each result
+    keyed in INSIGHT_QUERIES order.
+
+    In concurrent mode a failed or timed-out query only affects its own entry.
+    """
+    keys = [key for key in INSIGHT_QUERIES if keys is None or key in keys]
+    if not keys:
+        return {}
+    queries = [INSIGHT_QUERIES[key] for key in keys]
+    if (mode or INSIGHT_EXECUTION) == 'concurrent':
+        results = db.execute_concurrent(queries, timeout or INSIGHT_QUERY_TIMEOUT)
+    else:
+        start = time.perf_counter()
+        try:
+            results = [QueryResult(rows) for rows in db.execute_batch(queries)]
+        except Exception as exc:
+            results = [QueryResult(None, exc, time.perf_counter() - start)] * len(queries)
+    return dict(zip(keys, results))
+
+
+def insight_version(db: DatabaseManager, key: str) -> Tuple:
+    """Data version an insight was built from: the database plus the write generation of
+    every table its query reads (bumped by local writes and by sync_changes())"""
+    return db.backend.key, db.cache.generation(INSIGHT_QUERIES[key], db.backend.key)
+
+
+class InsightMemo:
+    """The last built section of each insight and the data version it was built from,
+    shared by every session in the process"""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[Tuple, float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: Tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version or entry[1] < time.monotonic():
+            return None
+        return entry[2]
+
+    def put(self, key: str, version: Tuple, value):
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_memo: Optional[InsightMemo] = None
+_memo_lock = threading.Lock()
+
+
+def get_insight_memo() -> InsightMemo:
+    """Process-wide memo; entries expire with the query cache TTL so out-of-band writes show up"""
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = InsightMemo(ttl=float(os.getenv('QUERY_CACHE_TTL', '300')))
+        return _memo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the insight queries in batch and concurrent mode")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    for mode in ['batch', 'concurrent']:
+        timings = []
+        for _ in range(args.runs):
+            db.cache.clear()
+            start = time.perf_counter()
+            results = fetch_insights(db, mode)
+            timings.append(time.perf_counter() - start)
+        failed = [key for key, result in results.items() if result.error is not None]
+        print(f"{mode:<11} best {min(timings) * 1000:.1f} ms over {args.runs} runs"
+              + (f"; failed: {', '.join(failed)}" if failed else ""))
+    slowest = max(results.items(), key=lambda item: item[1].seconds)
+    print(f"slowest single query: {slowest[0]} ({slowest[1].seconds * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
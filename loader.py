@@ -0,0 +1,116 @@
+"""Pipelined generator-to-database loading.
+
+A producer thread pulls fixed-size batches from a DataGenerator into a bounded
+queue while the caller's thread inserts them, so generation overlaps with
+insertion and at most `queue_size` batches are held in memory at once.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from database import DatabaseManager, DATA_TABLES
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_COMMIT_EVERY = 50000
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+class LoadProgress:
+    """Reports rows loaded and rows/sec for one table, at most once per interval"""
+
+    def __init__(self, table: str, total: Optional[int] = None, interval: float = 1.0,
+                 report: Callable[[str], None] = print):
+        self.table = table
+        self.total = total
+        self.interval = interval
+        self.report = report
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __call__(self, rows: int):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report(self._line())
+
+    def finish(self):
+        self.report(self._line() + f" in {time.perf_counter() - self.started:.1f}s")
+
+    def _line(self) -> str:
+        of_total = f"/{self.total}" if self.total else ""
+        return f"{self.table}: {self.rows}{of_total} rows ({self.rows_per_sec:,.0f} rows/s)"
+
+
+def _produce(batches: Iterable[List[Tuple]], pending: queue.Queue, stop: threading.Event, errors: list):
+    try:
+        for batch in batches:
+            while not stop.is_set():
+                try:
+                    pending.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+    except BaseException as exc:
+        errors.append(exc)
+    while not stop.is_set():
+        try:
+            pending.put(_DONE, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def load_table(db: DatabaseManager, table: str, batches: Iterable[List[Tuple]],
+               batch_size: int = DEFAULT_BATCH_SIZE, commit_every: int = DEFAULT_COMMIT_EVERY,
+               queue_size: int = DEFAULT_QUEUE_SIZE, progress: Optional[Callable[[int], None]] = None,
+               bulk: bool = False) -> int:
+    """Insert generator batches into one table through a bounded queue; returns rows inserted"""
+    pending = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    producer = threading.Thread(target=_produce, args=(batches, pending, stop, errors), daemon=True)
+    producer.start()
+
+    def rows() -> Iterator[Tuple]:
+        while True:
+            batch = pending.get()
+            if batch is _DONE:
+                if errors:
+                    raise errors[0]
+                return
+            yield from batch
+
+    try:
+        return db.insert_data(table, rows(), batch_size=batch_size,
+                              commit_every=commit_every, on_batch=progress, bulk=bulk)
+    finally:
+        stop.set()
+        producer.join()
+
+
+def load_dataset(db: DatabaseManager, generator, batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit_every: int = DEFAULT_COMMIT_EVERY, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 report: Optional[Callable[[str], None]] = print, bulk: bool = False) -> int:
+    """Load all four tables from a DataGenerator, parents first; returns total rows.
+
+    bulk=True ingests each commit_every-row chunk with LOAD DATA LOCAL INFILE.
+    """
+    total = 0
+    for table in DATA_TABLES:
+        progress = LoadProgress(table, generator.num_records, report=report) if report else None
+        total += load_table(db, table, generator.iter_batches(table, batch_size),
+                            batch_size, commit_every, queue_size, progress, bulk)
+        if progress:
+            progress.finish()
+    return total
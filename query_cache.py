@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import os
+import re
+import sys
+import threading
+import time
+
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so formatting differences share a cache entry"""
+    return _WHITESPACE.sub(' ', query).strip().rstrip(';')
+
+
+def tables_in(query: str) -> frozenset:
+    """Tables a SELECT reads from, used for per-table invalidation"""
+    return frozenset(name.lower() for name in _TABLE_PATTERN.findall(query))
+
+
+def estimate_size(rows: List[Tuple]) -> int:
+    """Rough in-memory footprint of a result set in bytes"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results with TTL, memory cap and per-table invalidation.
+
+    Every method takes a `scope` naming the database (DatabaseManager passes
+    backend.key), so one process can query several databases without one
+    serving the other's results or invalidating its tables.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (rows, tables, size, expires_at)
+        self._by_table: Dict[Tuple, set] = {}     # (scope, table) -> keys
+        self._generations: Dict[Tuple, int] = {}  # (scope, table) -> writes so far
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(query: str, params: tuple = (), scope: Hashable = None) -> Tuple[Hashable, str, tuple]:
+        return scope, normalize_query(query), tuple(params)
+
+    def get(self, query: str, params: tuple = (), scope: Hashable = None) -> Optional[List[Tuple]]:
+        """Cached rows for a query, or None on a miss"""
+        key = self.key(query, params, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return list(entry[0])
+
+    def generation(self, query: str, scope: Hashable = None) -> Tuple:
+        """Snapshot of the write generation of every table a query reads"""
+        tables = sorted(tables_in(query))
+        with self._lock:
+            return tuple(self._generations.get((scope, table), 0) for table in tables)
+
+    def put(self, query: str, params: tuple, rows: List[Tuple], generation: Optional[Tuple] = None,
+            scope: Hashable = None):
+        """Store rows unless a table they came from was written while the query ran"""
+        key = self.key(query, params, scope)
+        tables = [(scope, table) for table in sorted(tables_in(query))]
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != tuple(
+                    self._generations.get(table, 0) for table in tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (tuple(rows), tables, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate(self, tables: Iterable[str], scope: Hashable = None):
+        """Drop every cached result that reads from any of the given tables"""
+        with self._lock:
+            for table in tables:
+                table = (scope, table.lower())
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes)
+        return stats
+
+    def _remove(self, key):
+        rows, tables, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide cache shared by every dashboard session"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache(
+                max_entries=int(os.getenv('QUERY_CACHE_SIZE', '256')),
+                ttl=float(os.getenv('QUERY_CACHE_TTL', '300')),
+                max_bytes=int(float(os.getenv('QUERY_CACHE_MAX_MB', '64')) * 1024 * 1024),
+            )
+        return _cache
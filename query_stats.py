@@ -0,0 +1,240 @@
+"""Per-query instrumentation for DatabaseManager.
+
+Every query that reaches the database (cache hits do not) is recorded under a
+fingerprint: the statement with whitespace collapsed and literals, placeholders
+and IN lists replaced by ?, so the same template with different values shares
+one entry. Each fingerprint keeps call/row/byte/error totals and a rolling
+window of wall times for percentiles. Queries slower than SLOW_QUERY_SECONDS go
+to a bounded slow log together with their EXPLAIN plan (captured at most once
+per fingerprint per SLOW_QUERY_EXPLAIN_INTERVAL) and, when SLOW_QUERY_LOG is
+set, are appended to that file as JSON lines.
+
+prometheus_text() renders everything in the Prometheus text exposition format;
+set QUERY_METRICS_PORT to serve it at http://host:port/metrics.
+"""
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from query_cache import estimate_size, normalize_query, tables_in
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+
+# Rows sampled to estimate the size of a large result set
+BYTES_SAMPLE_ROWS = 100
+
+
+def fingerprint(query: str) -> str:
+    """Query template with literals and placeholders replaced by ?"""
+    query = _STRING_LITERAL.sub('?', normalize_query(query))
+    query = _PLACEHOLDER.sub('?', _NUMBER_LITERAL.sub('?', query))
+    return _IN_LIST.sub('IN (...)', query)
+
+
+def fingerprint_id(query: str) -> str:
+    """Short stable id for a fingerprint, used as the Prometheus label"""
+    return hashlib.sha1(fingerprint(query).encode()).hexdigest()[:12]
+
+
+def result_bytes(rows: List[Tuple]) -> int:
+    """Approximate in-memory size of a result set, extrapolated from its first rows"""
+    if len(rows) <= BYTES_SAMPLE_ROWS:
+        return estimate_size(rows)
+    return estimate_size(rows[:BYTES_SAMPLE_ROWS]) * len(rows) // BYTES_SAMPLE_ROWS
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+class SlowQuery(NamedTuple):
+    fingerprint: str
+    query: str
+    params: tuple
+    seconds: float
+    rows: int
+    at: float
+    plan: Optional[List[Dict]]
+
+
+class _Fingerprint:
+    def __init__(self, query: str, window: int):
+        self.fingerprint = fingerprint(query)
+        self.id = hashlib.sha1(self.fingerprint.encode()).hexdigest()[:12]
+        self.tables = ','.join(sorted(tables_in(query)))
+        self.durations = deque(maxlen=window)
+        self.calls = self.errors = self.slow = self.rows = self.bytes = 0
+        self.seconds = self.max_seconds = 0.0
+        self.explained_at = None
+
+
+class QueryStats:
+    """Thread-safe per-fingerprint timing, row and byte counters plus a slow-query log"""
+
+    def __init__(self, slow_seconds: float = 1.0, window: int = 500, max_fingerprints: int = 500,
+                 slow_log_size: int = 100, explain_interval: float = 300.0, log_path: Optional[str] = None,
+                 enabled: bool = True):
+        self.slow_seconds = slow_seconds
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.explain_interval = explain_interval
+        self.log_path = log_path
+        self.enabled = enabled
+        self._entries: 'OrderedDict[str, _Fingerprint]' = OrderedDict()
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def _entry(self, query: str) -> _Fingerprint:
+        key = fingerprint(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Fingerprint(query, self.window)
+            if len(self._entries) > self.max_fingerprints:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+    def record(self, query: str, seconds: float, rows: Optional[List[Tuple]] = None,
+               error: Optional[BaseException] = None) -> bool:
+        """Add one execution; returns True when it was slow and should be logged"""
+        if not self.enabled:
+            return False
+        size = result_bytes(rows) if rows else 0
+        with self._lock:
+            entry = self._entry(query)
+            entry.calls += 1
+            if error is not None:
+                entry.errors += 1
+                return False
+            entry.durations.append(seconds)
+            entry.seconds += seconds
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            entry.rows += len(rows) if rows else 0
+            entry.bytes += size
+            if seconds < self.slow_seconds:
+                return False
+            entry.slow += 1
+            return True
+
+    def explain_due(self, query: str) -> bool:
+        """Whether this fingerprint's plan should be captured now (claims the slot if so)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(query)
+            if entry.explained_at is not None and now - entry.explained_at < self.explain_interval:
+                return False
+            entry.explained_at = now
+            return True
+
+    def log_slow(self, query: str, params: tuple, seconds: float, rows: int, plan: Optional[List[Dict]] = None):
+        slow = SlowQuery(fingerprint(query), normalize_query(query), tuple(params), seconds, rows, time.time(), plan)
+        with self._lock:
+            self._slow_log.append(slow)
+        if self.log_path:
+            with open(self.log_path, 'a') as log:
+                log.write(json.dumps(slow._asdict(), default=str) + '\n')
+
+    def slow_queries(self) -> List[SlowQuery]:
+        """Logged slow queries, newest first"""
+        with self._lock:
+            return list(reversed(self._slow_log))
+
+    def snapshot(self) -> List[Dict]:
+        """One dict per fingerprint with totals and rolling p50/p95/p99, slowest p95 first"""
+        with self._lock:
+            entries = [(entry, list(entry.durations)) for entry in self._entries.values()]
+        rows = []
+        for entry, durations in entries:
+            rows.append({'id': entry.id, 'fingerprint': entry.fingerprint, 'tables': entry.tables,
+                         'calls': entry.calls, 'errors': entry.errors, 'slow': entry.slow,
+                         'rows': entry.rows, 'bytes': entry.bytes, 'seconds': entry.seconds,
+                         'max_seconds': entry.max_seconds, 'p50': percentile(durations, 50),
+                         'p95': percentile(durations, 95), 'p99': percentile(durations, 99)})
+        return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._slow_log.clear()
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        stats = self.snapshot()
+        lines = ['# HELP placement_query_info Normalized query text per fingerprint id',
+                 '# TYPE placement_query_info gauge']
+        lines += [f'placement_query_info{{fingerprint="{row["id"]}",tables="{_label(row["tables"])}",'
+                  f'query="{_label(row["fingerprint"][:200])}"}} 1' for row in stats]
+        lines += ['# HELP placement_query_duration_seconds Query wall time (quantiles over a rolling window)',
+                  '# TYPE placement_query_duration_seconds summary']
+        for row in stats:
+            for quantile, value in (('0.5', row['p50']), ('0.95', row['p95']), ('0.99', row['p99'])):
+                lines.append(f'placement_query_duration_seconds{{fingerprint="{row["id"]}",'
+                             f'quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'placement_query_duration_seconds_sum{{fingerprint="{row["id"]}"}} {row["seconds"]:.6f}')
+            lines.append(f'placement_query_duration_seconds_count{{fingerprint="{row["id"]}"}} '
+                         f'{row["calls"] - row["errors"]}')
+        for name, field, help_text in [('placement_query_rows_total', 'rows', 'Rows fetched'),
+                                       ('placement_query_bytes_total', 'bytes', 'Approximate result bytes fetched'),
+                                       ('placement_query_errors_total', 'errors', 'Queries that raised'),
+                                       ('placement_slow_queries_total', 'slow', 'Queries over the slow threshold')]:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            lines += [f'{name}{{fingerprint="{row["id"]}"}} {row[field]}' for row in stats]
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = get_query_stats().prometheus_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """Serve prometheus_text() on /metrics from a daemon thread"""
+    server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='query-metrics', daemon=True).start()
+    return server
+
+
+_stats: Optional[QueryStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_query_stats() -> QueryStats:
+    """Process-wide statistics shared by every DatabaseManager"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = QueryStats(
+                slow_seconds=float(os.getenv('SLOW_QUERY_SECONDS', '1.0')),
+                window=int(os.getenv('QUERY_STATS_WINDOW', '500')),
+                explain_interval=float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '300')),
+                log_path=os.getenv('SLOW_QUERY_LOG') or None,
+                enabled=os.getenv('QUERY_STATS', '1') == '1',
+            )
+            port = os.getenv('QUERY_METRICS_PORT')
+            if port:
+                start_metrics_server(int(port))
+        return _stats
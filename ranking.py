@@ -0,0 +1,269 @@
+"""Weighted top-K shortlists over the whole cohort.
+
+Every metric a recruiter might weigh (programming, soft skills including
+leadership, critical thinking and interpersonal skills, mock interview score,
+internships and interview rounds cleared) is read from the shared compact
+cohort (cohort.get_cohort_model) as views of its narrow integer columns. A
+composite score is a weighted sum of those columns with each weight divided by
+the metric's range, scaled to 0-100.
+
+The top K is selected without sorting the cohort: np.partition finds the K-th
+best score in linear time and only the students at or above it are sorted
+(score descending, then student_id, so ties are deterministic). Per-group top K
+(per batch or per company) groups the students once with a stable counting sort
+on the small integer group codes and partitions each group's slice.
+
+Writes through DatabaseManager refresh just the written students in the
+cohort, and the model follows it. To compare against a full sort:
+
+    python ranking.py --check 50
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from cohort import CohortModel, column_values, get_cohort_model
+
+# (cohort column, top of its range); scores divide by the range
+METRICS = [
+    ('problems_solved', 100),
+    ('assessments_completed', 20),
+    ('mini_projects', 5),
+    ('certifications_earned', 3),
+    ('latest_project_score', 100),
+    ('communication', 100),
+    ('teamwork', 100),
+    ('presentation', 100),
+    ('leadership', 100),
+    ('critical_thinking', 100),
+    ('interpersonal_skills', 100),
+    ('mock_interview_score', 100),
+    ('internships_completed', 3),
+    ('interview_rounds_cleared', 4),
+]
+
+METRIC_NAMES = [name for name, _ in METRICS]
+
+# Columns students can be grouped by for a per-group top K
+GROUP_COLUMNS = ['course_batch', 'company_name']
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """'problems_solved=2,leadership=1' -> weights; metrics left out weigh 0"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, _, value = item.partition('=')
+        if name.strip() not in METRIC_NAMES:
+            raise ValueError(f"Unknown metric {name.strip()!r}; expected one of {', '.join(METRIC_NAMES)}")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+# Weights used when none are given, e.g. RANKING_WEIGHTS="problems_solved=2,mock_interview_score=2,leadership=1"
+DEFAULT_WEIGHTS = parse_weights(os.getenv(
+    'RANKING_WEIGHTS', 'problems_solved=2,latest_project_score=2,mock_interview_score=2,'
+    'communication=1,teamwork=1,presentation=1,leadership=1,critical_thinking=1,interpersonal_skills=1,'
+    'assessments_completed=1,mini_projects=1,certifications_earned=1,internships_completed=1,'
+    'interview_rounds_cleared=1'))
+
+class Ranked(NamedTuple):
+    group: Optional[str]   # None for an overall ranking
+    rank: int              # 1-based within the group
+    student_id: int
+    score: float           # 0-100
+
+
+def top_k(scores: np.ndarray, student_ids: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k best scores, best first; ties go to the lower student_id"""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # Linear-time selection of the k-th best; everything tied with it stays a candidate
+        kth = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((student_ids[candidates], -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def top_k_per_group(scores: np.ndarray, student_ids: np.ndarray, groups: np.ndarray,
+                    k: int) -> Dict[int, np.ndarray]:
+    """Positions of the k best scores within each group code, best first"""
+    if len(scores) == 0:
+        return {}
+    # Stable sort of small integer codes is a radix sort in NumPy: one O(n) grouping pass
+    order = np.argsort(groups, kind='stable')
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    result = {}
+    for segment in np.split(order, bounds):
+        result[int(groups[segment[0]])] = segment[top_k(scores[segment], student_ids[segment], k)]
+    return result
+
+
+class RankingModel:
+    """Vectorized weighted scoring and partial top-K selection over the shared cohort"""
+
+    def __init__(self, cohort: CohortModel):
+        self.cohort = cohort
+        self.student_ids = np.empty(0, dtype=np.int32)  # sorted
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0, dtype=np.uint8) for name in METRIC_NAMES}
+        self.groups: Dict[str, np.ndarray] = {column: np.empty(0, dtype=np.int8) for column in GROUP_COLUMNS}
+        self.labels: Dict[str, List[str]] = {column: [] for column in GROUP_COLUMNS}
+        self.version = None  # cohort version the columns come from
+        self._lock = threading.RLock()
+
+    def sync(self):
+        """Follow the cohort if its frame was replaced since the last sync"""
+        version, frame = self.cohort.snapshot()
+        with self._lock:
+            if version == self.version:
+                return
+            # Only students with a row in every table are ranked, as on the SQL paths; the
+            # columns stay views of the cohort unless some students have to be left out
+            joined = column_values(frame['joined']).astype(bool)
+            pick = (lambda values: values) if joined.all() else (lambda values: values[joined])
+            # A missing metric counts as 0
+            self.student_ids = pick(column_values(frame['student_id']))
+            self.columns = {name: pick(column_values(frame[name])) for name in METRIC_NAMES}
+            self.groups = {column: pick(column_values(frame[column])) for column in GROUP_COLUMNS}
+            self.labels = {column: list(frame[column].cat.categories) for column in GROUP_COLUMNS}
+            self.version = version
+
+    # -- ranking -----------------------------------------------------------
+
+    def scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """Composite 0-100 score per student: weighted mean of each metric as a fraction of its range"""
+        vector = np.array([weights.get(name, 0.0) for name in METRIC_NAMES], dtype=np.float32)
+        if (vector < 0).any() or vector.sum() <= 0:
+            raise ValueError("Weights must be non-negative with at least one above zero")
+        scales = np.array([scale for _, scale in METRICS], dtype=np.float32)
+        factors = vector * 100 / (scales * vector.sum())
+        with self._lock:
+            columns, count = self.columns, len(self.student_ids)
+        scores = np.zeros(count, dtype=np.float32)
+        for name, factor in zip(METRIC_NAMES, factors):
+            if factor:
+                scores += columns[name] * factor
+        return scores
+
+    def rank(self, weights: Dict[str, float], k: int, group_by: Optional[str] = None,
+             student_ids: Optional[Sequence[int]] = None) -> List[Ranked]:
+        """Top k students overall, or per value of `group_by` (a GROUP_COLUMNS name),
+        optionally among `student_ids` only (e.g. the currently eligible students)"""
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r}; expected one of {', '.join(GROUP_COLUMNS)}")
+        with self._lock:
+            ids, groups = self.student_ids, self.groups.get(group_by)
+            labels = list(self.labels[group_by]) if group_by else []
+            scores = self.scores(weights)
+        if student_ids is not None:
+            subset = np.isin(ids, np.asarray(student_ids, dtype=np.int64))
+            ids, scores = ids[subset], scores[subset]
+            groups = groups[subset] if groups is not None else None
+        if group_by is None:
+            picks = {None: top_k(scores, ids, k)}
+            order = [None]
+        else:
+            picks = top_k_per_group(scores, ids, groups, k)
+            order = sorted(picks, key=lambda code: labels[code] if code >= 0 else '')
+        ranked = []
+        for code in order:
+            group = None if code is None else labels[code] if code >= 0 else 'N/A'
+            ranked.extend(Ranked(group, rank, int(ids[position]), float(scores[position]))
+                          for rank, position in enumerate(picks[code], 1))
+        return ranked
+
+    def metric_rows(self, student_ids: Sequence[int]) -> Dict[int, Dict[str, int]]:
+        """Raw metric values per student id"""
+        with self._lock:
+            ids, columns = self.student_ids, self.columns
+        wanted = np.asarray(student_ids, dtype=np.int64)
+        positions = np.searchsorted(ids, wanted)
+        found = positions < len(ids)
+        found[found] &= ids[positions[found]] == wanted[found]
+        return {int(student_id): {name: int(columns[name][position]) for name in METRIC_NAMES}
+                for student_id, position in zip(wanted[found], positions[found])}
+
+    def memory_bytes(self) -> int:
+        """Bytes held beyond the cohort: copies made when unjoined students are left out"""
+        arrays = [self.student_ids, *self.columns.values(), *self.groups.values()]
+        return sum(array.nbytes for array in arrays if array.base is None)
+
+
+_model: Optional[RankingModel] = None
+_model_lock = threading.Lock()
+
+
+def get_ranking_model() -> RankingModel:
+    """Process-wide model over the process-wide cohort, both synced before use"""
+    global _model
+    cohort = get_cohort_model()
+    with _model_lock:
+        if _model is None:
+            _model = RankingModel(cohort)
+    _model.sync()
+    return _model
+
+
+def full_sort_top_k(scores: np.ndarray, student_ids: np.ndarray, groups: Optional[np.ndarray],
+                    k: int) -> Dict[Optional[int], np.ndarray]:
+    """Reference result: sort everything, then take the first k (per group)"""
+    if groups is None:
+        return {None: np.lexsort((student_ids, -scores))[:k]}
+    order = np.lexsort((student_ids, -scores, groups))
+    if len(order) == 0:
+        return {}
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    return {int(groups[segment[0]]): segment[:k] for segment in np.split(order, bounds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weighted top-K shortlist over the cohort")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--by', choices=GROUP_COLUMNS, help="top K per batch or per company")
+    parser.add_argument('--weights', help="e.g. problems_solved=2,leadership=1 (default: RANKING_WEIGHTS)")
+    parser.add_argument('--check', type=int, metavar='N', help="compare N random weightings with a full sort")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = get_ranking_model()
+    print(f"Loaded {len(model.student_ids)} students in {time.perf_counter() - start:.2f}s "
+          f"({model.cohort.memory_bytes() / 1024:.0f} KiB cohort + {model.memory_bytes() / 1024:.0f} KiB derived)")
+
+    if args.check:
+        rng = random.Random(args.seed)
+        partial_time = sort_time = 0.0
+        for _ in range(args.check):
+            weights = {name: rng.choice([0, 0, 1, 2, 3]) for name in METRIC_NAMES}
+            weights[rng.choice(METRIC_NAMES)] = 1
+            scores = model.scores(weights)
+            groups = model.groups[args.by] if args.by else None
+            start = time.perf_counter()
+            if groups is None:
+                fast = {None: top_k(scores, model.student_ids, args.k)}
+            else:
+                fast = top_k_per_group(scores, model.student_ids, groups, args.k)
+            partial_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = full_sort_top_k(scores, model.student_ids, groups, args.k)
+            sort_time += time.perf_counter() - start
+            if fast.keys() != expected.keys() or any(not np.array_equal(fast[g], expected[g]) for g in fast):
+                raise SystemExit(f"Mismatch for weights {weights}")
+        print(f"{args.check} weightings matched; partial selection {partial_time / args.check * 1000:.2f} ms, "
+              f"full sort {sort_time / args.check * 1000:.2f} ms")
+        return
+
+    weights = parse_weights(args.weights) if args.weights else DEFAULT_WEIGHTS
+    for ranked in model.rank(weights, args.k, args.by):
+        prefix = f"{ranked.group:<16}" if ranked.group is not None else ''
+        print(f"{prefix}{ranked.rank:>4}  student {ranked.student_id:<8} {ranked.score:6.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Per-phase timing of one dashboard rerun.
+
+The dashboard opens a section per page area (the sidebar, Eligible Students,
+each numbered insight) and calls lap(name) after each step, which records the
+time since the previous lap under that name: 'sql', 'pandas', 'figure' (Plotly
+figure construction), 'chart'/'table' (st.plotly_chart / st.dataframe
+serialization into the page). Queries that run concurrently are added with
+record() using their own start and duration.
+
+Enable with RENDER_PROFILE=1 or the ?profile=1 query parameter. With
+RENDER_PROFILE_DIR set, the whole rerun also runs under cProfile and the stats
+are dumped there as one .prof file per rerun (open with snakeviz or pstats).
+"""
+from contextlib import contextmanager
+from typing import List, NamedTuple, Optional
+import cProfile
+import io
+import os
+import pstats
+import time
+
+RENDER_PROFILE = os.getenv('RENDER_PROFILE', '0') == '1'
+RENDER_PROFILE_DIR = os.getenv('RENDER_PROFILE_DIR') or None
+
+
+class Phase(NamedTuple):
+    section: str
+    name: str
+    start: float     # seconds since the rerun started
+    seconds: float
+
+
+class RenderProfiler:
+    """Collects phases for one rerun; every method is a no-op while disabled"""
+
+    def __init__(self, enabled: bool = False, dump_dir: Optional[str] = None):
+        self.enabled = enabled
+        self.dump_dir = dump_dir if enabled else None
+        self.phases: List[Phase] = []
+        self.dump_path: Optional[str] = None
+        self._section = ''
+        self._origin = self._lap = time.perf_counter()
+        self._profile: Optional[cProfile.Profile] = None
+
+    def start(self):
+        """Mark the start of the rerun (and start cProfile when dumping)"""
+        if not self.enabled:
+            return
+        self._origin = self._lap = time.perf_counter()
+        if self.dump_dir:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    @contextmanager
+    def section(self, name: str):
+        """Attribute the laps inside the block to `name`"""
+        previous, self._section = self._section, name
+        self._lap = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._section = previous
+            self._lap = time.perf_counter()
+
+    def lap(self, name: str):
+        """Record the time since the previous lap (or the section start) as phase `name`"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append(Phase(self._section, name, self._lap - self._origin, now - self._lap))
+        self._lap = now
+
+    def record(self, section: str, name: str, started: float, seconds: float):
+        """Add a phase timed elsewhere; `started` is a time.perf_counter() value"""
+        if self.enabled:
+            self.phases.append(Phase(section, name, started - self._origin, seconds))
+
+    def finish(self) -> Optional[str]:
+        """Stop cProfile and dump its stats; returns the top functions by cumulative time"""
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        os.makedirs(self.dump_dir, exist_ok=True)
+        self.dump_path = os.path.join(self.dump_dir, time.strftime('rerun-%Y%m%d-%H%M%S') +
+                                      f'-{int(time.time() * 1000) % 1000:03d}.prof')
+        self._profile.dump_stats(self.dump_path)
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(25)
+        self._profile = None
+        return out.getvalue()
+
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self._origin
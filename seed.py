@@ -0,0 +1,100 @@
+"""Seed the placement database with synthetic data.
+
+The dashboard calls ``seed_database`` on start-up, which only writes when the
+version marker stored in ``app_meta`` is missing or names an older schema or
+data version. The cohort size is recorded in the marker but never compared, so
+a database seeded with ``--records`` or grown through upsert_data is kept.
+Reseeding an already seeded database is an explicit action:
+
+    python seed.py              # seed only if needed
+    python seed.py --force      # wipe and regenerate all data
+    python seed.py --records 500 --force
+    python seed.py --records 1000000 --bulk --random-seed 42 --force
+"""
+import argparse
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+from database import DatabaseManager, SCHEMA_VERSION, SEED_MARKER_KEY
+from loader import DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_EVERY, load_dataset
+
+if TYPE_CHECKING:
+    # The generator (and Faker) is only imported when a seed actually runs
+    from data_generator import DataGenerator
+
+# Bump whenever DataGenerator output changes shape or distribution
+DATA_VERSION = 1
+NUM_RECORDS = 100
+
+
+def seed_marker(num_records: int = NUM_RECORDS) -> str:
+    """Marker value describing the schema, generator and cohort size"""
+    return f"schema={SCHEMA_VERSION};data={DATA_VERSION};records={num_records}"
+
+
+def marker_versions(marker: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(schema, data) versions named by a stored marker, or None when there is none"""
+    if not marker:
+        return None
+    fields = dict(part.partition('=')[::2] for part in marker.split(';'))
+    return fields.get('schema'), fields.get('data')
+
+
+def is_seeded(db: DatabaseManager) -> bool:
+    """Check whether a complete seed of the current schema and data version is stored"""
+    return marker_versions(db.get_meta(SEED_MARKER_KEY)) == (str(SCHEMA_VERSION), str(DATA_VERSION))
+
+
+def seed_database(db: DatabaseManager, num_records: int = NUM_RECORDS, force: bool = False,
+                  generator: Optional['DataGenerator'] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                  commit_every: int = DEFAULT_COMMIT_EVERY,
+                  report: Optional[Callable[[str], None]] = None, bulk_load: bool = False) -> bool:
+    """Populate the database unless it is already seeded; returns True if data was written"""
+    db.connect()
+    try:
+        if not force and is_seeded(db):
+            return False
+
+        # Drop the marker first so an interrupted seed is retried on the next run
+        db.delete_meta(SEED_MARKER_KEY)
+        db.clear_tables()
+
+        if generator is None:
+            from data_generator import DataGenerator
+            generator = DataGenerator(num_records)
+        load_dataset(db, generator, batch_size, commit_every, report=report, bulk=bulk_load)
+
+        db.set_meta(SEED_MARKER_KEY, seed_marker(num_records))
+        return True
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the placement database")
+    parser.add_argument('--force', action='store_true', help="wipe and reseed even if the database is already seeded")
+    parser.add_argument('--records', type=int, default=NUM_RECORDS, help="number of students to generate")
+    parser.add_argument('--bulk', action='store_true', help="use the vectorized generator for large cohorts")
+    parser.add_argument('--random-seed', type=int, default=0, help="seed for reproducible --bulk output")
+    parser.add_argument('--workers', type=int, default=None, help="--bulk worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="rows per INSERT batch")
+    parser.add_argument('--commit-every', type=int, default=DEFAULT_COMMIT_EVERY, help="rows per transaction")
+    parser.add_argument('--load-data', action='store_true',
+                        help="ingest with LOAD DATA LOCAL INFILE (falls back to INSERT if disabled)")
+    args = parser.parse_args()
+
+    generator = None
+    if args.bulk:
+        from data_generator import BulkDataGenerator
+        generator = BulkDataGenerator(args.records, seed=args.random_seed, workers=args.workers)
+
+    db = DatabaseManager()
+    db.create_tables()
+    if seed_database(db, args.records, force=args.force, generator=generator,
+                     batch_size=args.batch_size, commit_every=args.commit_every, report=print,
+                     bulk_load=args.load_data):
+        print(f"Seeded {args.records} students ({seed_marker(args.records)})")
+    else:
+        print(f"Database already seeded ({db.get_meta(SEED_MARKER_KEY)}); use --force to reseed")
+
+
+if __name__ == '__main__':
+    main()
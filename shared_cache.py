@@ -0,0 +1,281 @@
+"""Result cache shared by every dashboard process on a host (or behind one Redis).
+
+Each Streamlit process keeps its own in-memory QueryCache; this tier sits
+behind it so a result computed by one worker is reused by the others. Values
+are Arrow IPC streams with one typed column per result column; the dashboard
+builds its insight DataFrames straight from these rows (frames.to_frame), so
+only the rows are shared.
+
+Keys include the change watermarks of every base table a query depends on (see
+DatabaseManager.sync_changes), so a write anywhere moves readers to new keys
+and no cross-process invalidation is needed; stale entries simply expire.
+
+A miss is single-flight: the first worker takes a short-lived lock for the key
+and runs the query while the others poll for its result, so N workers do not
+all hit the database with the same insight query after a data refresh. A
+worker that waits longer than SHARED_CACHE_LOCK_TIMEOUT queries for itself.
+
+    SHARED_CACHE=disk  (SHARED_CACHE_DIR, default <tmp>/placement_cache)
+    SHARED_CACHE=redis (SHARED_CACHE_URL, default redis://localhost:6379/0)
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+# '' (off), 'disk' or 'redis'
+SHARED_CACHE = os.getenv('SHARED_CACHE', '')
+
+# Where the disk store keeps its files, and the Redis server for the redis store
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'placement_cache')
+SHARED_CACHE_URL = os.getenv('SHARED_CACHE_URL', 'redis://localhost:6379/0')
+
+# Seconds an entry lives, and how long a worker waits for another worker's result
+SHARED_CACHE_TTL = float(os.getenv('SHARED_CACHE_TTL', '300'))
+SHARED_CACHE_LOCK_TIMEOUT = float(os.getenv('SHARED_CACHE_LOCK_TIMEOUT', '30'))
+
+# Results larger than this are not shared
+SHARED_CACHE_MAX_MB = float(os.getenv('SHARED_CACHE_MAX_MB', '64'))
+
+# Seconds between checks while another worker computes a result
+POLL_INTERVAL = 0.05
+
+# The disk store sweeps expired files after every this many writes
+PRUNE_EVERY = 100
+
+
+def cache_key(*parts) -> str:
+    """Stable key for any JSON-able parts (repr() for the rest)"""
+    return hashlib.sha1(json.dumps(parts, default=repr, sort_keys=True).encode()).hexdigest()
+
+
+def encode_rows(rows: List[Tuple]) -> bytes:
+    """Result rows as an Arrow IPC stream; raises when a column has no common Arrow type"""
+    import pyarrow as pa
+    width = len(rows[0]) if rows else 0
+    table = pa.table({f'c{i}': pa.array([row[i] for row in rows]) for i in range(width)})
+    return _write_ipc(table)
+
+
+def decode_rows(data: bytes) -> List[Tuple]:
+    table = _read_ipc(data)
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+
+def _write_ipc(table) -> bytes:
+    import pyarrow as pa
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _read_ipc(data: bytes):
+    import pyarrow as pa
+    return pa.ipc.open_stream(data).read_all()
+
+
+class DiskStore:
+    """One file per key in a directory; locks are O_EXCL lock files"""
+
+    def __init__(self, directory: str, ttl: float = 300.0):
+        self.directory = directory
+        self.ttl = ttl
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.arrow')
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, 'rb') as entry:
+                return entry.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes):
+        # Write then rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as entry:
+            entry.write(data)
+        os.replace(temp_path, self._path(key))
+        # Writes move readers to new keys, so old entries are never read again; sweep them now and then
+        self._puts += 1
+        if self._puts % PRUNE_EVERY == 0:
+            self.prune()
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        path = self._path(key) + '.lock'
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            # A worker that died while holding the lock leaves it behind; break it once it is old
+            try:
+                if os.path.getmtime(path) + timeout < time.time():
+                    os.remove(path)
+            except OSError:
+                pass
+            return False
+
+    def release(self, key: str):
+        try:
+            os.remove(self._path(key) + '.lock')
+        except OSError:
+            pass
+
+    def prune(self):
+        """Remove entries past their TTL"""
+        expired = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith('.arrow') and os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(('.arrow', '.lock', '.tmp')):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class RedisStore:
+    """Entries and locks as Redis keys with expiry (SET NX PX for locks)"""
+
+    def __init__(self, url: str, ttl: float = 300.0, prefix: str = 'placement:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def put(self, key: str, data: bytes):
+        self.client.set(self.prefix + key, data, px=int(self.ttl * 1000))
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        return bool(self.client.set(self.prefix + key + ':lock', b'1', nx=True, px=int(timeout * 1000)))
+
+    def release(self, key: str):
+        self.client.delete(self.prefix + key + ':lock')
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class SharedCache:
+    """Single-flight get-or-compute over a shared store"""
+
+    def __init__(self, store, lock_timeout: float = 30.0, max_bytes: int = 64 * 1024 * 1024):
+        self.store = store
+        self.lock_timeout = lock_timeout
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'waits': 0, 'errors': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_rows(self, key: str) -> Optional[List[Tuple]]:
+        """Stored rows for `key`, or None on a miss"""
+        rows = self._read(key)
+        self._count('misses' if rows is None else 'hits')
+        return rows
+
+    def _read(self, key: str) -> Optional[List[Tuple]]:
+        try:
+            data = self.store.get(key)
+            return None if data is None else decode_rows(data)
+        except Exception:
+            # The shared tier is an optimisation; a broken store or entry means a miss
+            self._count('errors')
+            return None
+
+    def put_rows(self, key: str, rows: List[Tuple]):
+        try:
+            data = encode_rows(rows)
+            if len(data) <= self.max_bytes:
+                self.store.put(key, data)
+        except Exception:
+            self._count('errors')
+
+    def rows(self, key: str, compute: Callable[[], List[Tuple]], wait: Optional[float] = None) -> List[Tuple]:
+        """Shared rows for `key`, running compute() in at most one worker at a time; the
+        others wait up to `wait` (default: the lock timeout) before computing it themselves"""
+        rows = self.get_rows(key)
+        if rows is not None:
+            return rows
+        deadline = time.monotonic() + min(wait or self.lock_timeout, self.lock_timeout)
+        waited = False
+        while True:
+            try:
+                acquired = self.store.acquire(key, self.lock_timeout)
+            except Exception:
+                self._count('errors')
+                return compute()
+            if acquired:
+                try:
+                    # Another worker may have stored it between our miss and taking the lock
+                    rows = self._read(key)
+                    if rows is None:
+                        rows = compute()
+                        self.put_rows(key, rows)
+                    return rows
+                finally:
+                    self.store.release(key)
+            if not waited:
+                waited = True
+                self._count('waits')
+            time.sleep(POLL_INTERVAL)
+            rows = self._read(key)
+            if rows is not None:
+                return rows
+            if time.monotonic() > deadline:
+                return compute()
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+_shared: Optional[SharedCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """Process-wide handle on the shared tier, or None when SHARED_CACHE is unset"""
+    global _shared
+    if not SHARED_CACHE:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            if SHARED_CACHE == 'redis':
+                store = RedisStore(SHARED_CACHE_URL, SHARED_CACHE_TTL)
+            elif SHARED_CACHE == 'disk':
+                store = DiskStore(SHARED_CACHE_DIR, SHARED_CACHE_TTL)
+            else:
+                raise ValueError(f"Unknown SHARED_CACHE: {SHARED_CACHE}")
+            _shared = SharedCache(store, SHARED_CACHE_LOCK_TIMEOUT,
+                                  int(SHARED_CACHE_MAX_MB * 1024 * 1024))
+        return _shared
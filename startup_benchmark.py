@@ -0,0 +1,136 @@
+"""Cold-start benchmark for the dashboard.
+
+Every run starts a fresh Python process that loads app.py with Streamlit's
+AppTest against its own copy of a seeded SQLite database, and reports:
+
+- import_ms: time spent importing the modules the dashboard script loads
+  beyond Streamlit itself (from python -X importtime)
+- first_paint_ms: the first script run to completion, i.e. time to first paint
+- rerun_ms: a second run in the same process (an interaction)
+- which heavy optional modules the first paint loaded
+
+--rev measures other git revisions (exported with git archive) next to the
+working tree, for a before/after comparison:
+
+    python startup_benchmark.py
+    python startup_benchmark.py --rev HEAD~1 --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import closing
+from typing import Dict
+
+# Modules a first paint should not need to load
+HEAVY_MODULES = ['data_generator', 'faker', 'plotly.express', 'mysql.connector']
+
+_MARKER = '-- app start --'
+
+# Runs inside the measured process: sys.argv[1] is the source tree
+_CHILD = f'''
+import json, os, sys, time
+src = sys.argv[1]
+sys.path.insert(0, src)
+os.chdir(src)
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({_MARKER!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at = AppTest.from_file(os.path.join(src, "app.py"), default_timeout=600).run()
+first_paint = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({{"first_paint_ms": first_paint * 1000, "rerun_ms": rerun * 1000,
+                  "errors": [e.message for e in at.exception],
+                  "modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+'''
+
+
+def import_ms(stderr: str) -> float:
+    """Cumulative time of the top-level imports logged after the marker"""
+    total, started = 0, False
+    for line in stderr.splitlines():
+        if line == _MARKER:
+            started = True
+        elif started and line.startswith('import time:'):
+            _, cumulative, name = line[len('import time:'):].split('|')
+            # Nested imports are indented under the module that triggered them
+            if cumulative.strip().isdigit() and not name.startswith('  ', 1):
+                total += int(cumulative)
+    return total / 1000
+
+
+def export_revision(rev: str, workdir: str) -> str:
+    path = os.path.join(workdir, rev.replace('/', '_').replace('~', '-'))
+    os.makedirs(path)
+    archive = subprocess.run(['git', 'archive', rev], check=True, capture_output=True).stdout
+    subprocess.run(['tar', '-x', '-C', path], input=archive, check=True)
+    return path
+
+
+def measure(src: str, runs: int, workdir: str) -> Dict:
+    env = dict(os.environ, DB_BACKEND='sqlite')
+    env.pop('SHARED_CACHE', None)
+    seeded = os.path.join(workdir, os.path.basename(src) + '.db')
+    # Seeded with the revision's own code, so the dashboard finds its marker and does not reseed
+    subprocess.run([sys.executable, 'seed.py'], cwd=src, env=dict(env, DB_PATH=seeded), check=True,
+                   capture_output=True)
+    # The rows may still sit in the -wal file; fold them into the main file so a plain copy has them
+    with closing(sqlite3.connect(seeded)) as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    results = []
+    for run in range(runs):
+        path = os.path.join(workdir, f'run_{run}.db')
+        shutil.copy(seeded, path)
+        child = subprocess.run([sys.executable, '-X', 'importtime', '-c', _CHILD, src], cwd=src,
+                               env=dict(env, DB_PATH=path), capture_output=True, text=True, check=True)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        result['import_ms'] = import_ms(child.stderr)
+        results.append(result)
+        os.remove(path)
+    return {
+        'import_ms': statistics.median(result['import_ms'] for result in results),
+        'first_paint_ms': statistics.median(result['first_paint_ms'] for result in results),
+        'rerun_ms': statistics.median(result['rerun_ms'] for result in results),
+        'modules': results[-1]['modules'],
+        'errors': results[-1]['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard import time and time to first paint")
+    parser.add_argument('--rev', nargs='*', default=[], help="git revisions to measure as well, e.g. HEAD~1")
+    parser.add_argument('--runs', type=int, default=3, help="fresh processes per tree (median reported)")
+    parser.add_argument('--output', help="write results to this JSON file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='placement_startup_')
+    try:
+        trees = [(rev, export_revision(rev, workdir)) for rev in args.rev]
+        trees.append(('working tree', os.path.dirname(os.path.abspath(__file__))))
+        report = {}
+        print(f"{'tree':<16}{'import ms':>11}{'first paint ms':>16}{'rerun ms':>10}  heavy modules loaded")
+        for name, src in trees:
+            result = report[name] = measure(src, args.runs, workdir)
+            print(f"{name:<16}{result['import_ms']:>11.0f}{result['first_paint_ms']:>16.0f}"
+                  f"{result['rerun_ms']:>10.0f}  {', '.join(result['modules']) or '-'}")
+            for error in result['errors']:
+                print(f"  error: {error}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""Materialized summary tables behind the grouped insights (1, 5, 7, 8 and 10).
+
+Each summary keeps one row per group with additive measures (sums and
+counts), so the dashboard reads a handful of rows instead of re-aggregating
+the students/programming/placements join on every page load.
+DatabaseManager keeps them current: every committed write applies the
+aggregate of just the written student ids as a delta, in the same
+transaction. To rebuild from scratch or compare against the live aggregates:
+
+    python summaries.py --rebuild
+    python summaries.py --check
+
+--check-maxima runs a regression check on a scratch SQLite database: it lowers,
+moves out of its group and deletes the row holding a company's latest
+placement and verifies the summaries after each step.
+"""
+import argparse
+import sys
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# Bump whenever a summary definition changes; create_tables then rebuilds them
+SUMMARY_VERSION = 1
+
+# app_meta key recording the SUMMARY_VERSION the summary tables were built with
+SUMMARY_MARKER_KEY = 'summary_version'
+
+# Student ids per IN (...) list when a write is not one contiguous id range
+ID_CHUNK = 1000
+
+
+class Summary(NamedTuple):
+    """One maintained aggregate; `select` yields (key, *measures) rows for the ids in {where}"""
+    table: str
+    sources: Tuple[str, ...]      # base tables whose writes change it
+    key: str
+    key_expr: str
+    id_column: str
+    columns: str                  # CREATE TABLE column definitions
+    measures: Tuple[str, ...]     # added/subtracted on each write
+    maxima: Tuple[str, ...]       # kept with GREATEST and recomputed once a write has removed rows
+    select: str
+
+
+SUMMARIES = [
+    # Insight 1: average problems solved per batch
+    Summary('summary_batch_problems', ('students', 'programming'), 'course_batch', 's.course_batch',
+            's.student_id',
+            'course_batch VARCHAR(50) PRIMARY KEY, problem_sum BIGINT NOT NULL, problem_count INT NOT NULL',
+            ('problem_sum', 'problem_count'), (), '''
+        SELECT s.course_batch, SUM(p.problems_solved), COUNT(p.problems_solved)
+        FROM students s
+        JOIN programming p ON s.student_id = p.student_id
+        WHERE s.course_batch IS NOT NULL AND {where}
+        GROUP BY s.course_batch
+    '''),
+    # Insight 5: average package of placed students per city
+    Summary('summary_city_packages', ('students', 'placements'), 'city', 's.city', 's.student_id',
+            'city VARCHAR(100) PRIMARY KEY, package_sum DOUBLE NOT NULL, placed_count INT NOT NULL',
+            ('package_sum', 'placed_count'), (), '''
+        SELECT s.city, SUM(pl.placement_package), COUNT(pl.placement_package)
+        FROM students s
+        JOIN placements pl ON s.student_id = pl.student_id
+        WHERE pl.placement_status = 'Placed' AND s.city IS NOT NULL AND {where}
+        GROUP BY s.city
+    '''),
+    # Insight 7: students per programming language
+    Summary('summary_language_counts', ('programming',), 'language', 'p.language', 'p.student_id',
+            'language VARCHAR(50) PRIMARY KEY, student_count INT NOT NULL',
+            ('student_count',), (), '''
+        SELECT p.language, COUNT(*)
+        FROM programming p
+        WHERE p.language IS NOT NULL AND {where}
+        GROUP BY p.language
+    '''),
+    # Insight 8: placed and total students per batch
+    Summary('summary_batch_placements', ('students', 'placements'), 'course_batch', 's.course_batch',
+            's.student_id',
+            'course_batch VARCHAR(50) PRIMARY KEY, placed_count INT NOT NULL, total_count INT NOT NULL',
+            ('placed_count', 'total_count'), (), '''
+        SELECT s.course_batch, COUNT(CASE WHEN pl.placement_status = 'Placed' THEN 1 END), COUNT(*)
+        FROM students s
+        JOIN placements pl ON s.student_id = pl.student_id
+        WHERE s.course_batch IS NOT NULL AND {where}
+        GROUP BY s.course_batch
+    '''),
+    # Insight 10: placements and latest placement date per company
+    Summary('summary_company_placements', ('students', 'placements'), 'company_name', 'pl.company_name',
+            's.student_id',
+            'company_name VARCHAR(100) PRIMARY KEY, placed_count INT NOT NULL, latest_placement_date DATE',
+            ('placed_count',), ('latest_placement_date',), '''
+        SELECT pl.company_name, COUNT(*), MAX(pl.placement_date)
+        FROM students s
+        JOIN placements pl ON s.student_id = pl.student_id
+        WHERE pl.placement_status = 'Placed' AND {where}
+        GROUP BY pl.company_name
+    '''),
+]
+
+SUMMARY_TABLES = [summary.table for summary in SUMMARIES]
+
+
+def summaries_for(tables: Iterable[str]) -> List[Summary]:
+    """Summaries affected by writes to any of these base tables"""
+    tables = set(tables)
+    return [summary for summary in SUMMARIES if tables.intersection(summary.sources)]
+
+
+def _id_predicates(column: str, student_ids: Set[int]) -> Iterator[Tuple[str, tuple]]:
+    """WHERE fragments covering the ids: one BETWEEN for a contiguous range, else IN chunks"""
+    ids = sorted(student_ids)
+    if ids[-1] - ids[0] + 1 == len(ids):
+        yield f'{column} BETWEEN %s AND %s', (ids[0], ids[-1])
+        return
+    for start in range(0, len(ids), ID_CHUNK):
+        chunk = ids[start:start + ID_CHUNK]
+        yield '{} IN ({})'.format(column, ','.join(['%s'] * len(chunk))), tuple(chunk)
+
+
+def _aggregate(cursor, summary: Summary, where: str = '1=1', params: tuple = ()) -> List[Tuple]:
+    cursor.execute(summary.select.format(where=where), params)
+    return cursor.fetchall()
+
+
+def _measures(summary: Summary, row: Tuple) -> Tuple:
+    # SUM over no non-NULL values is NULL; the stored sums start at zero
+    return tuple(0 if value is None else value for value in row[1:1 + len(summary.measures)])
+
+
+def _add(cursor, summary: Summary, rows: Iterable[Tuple]):
+    columns = (summary.key,) + summary.measures + summary.maxima
+    updates = [f'{column} = {column} + VALUES({column})' for column in summary.measures]
+    updates += [f'{column} = COALESCE(GREATEST({column}, VALUES({column})), VALUES({column}))'
+                for column in summary.maxima]
+    cursor.executemany('INSERT INTO {} ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}'.format(
+        summary.table, ', '.join(columns), ', '.join(['%s'] * len(columns)), ', '.join(updates)),
+        [(row[0],) + _measures(summary, row) + tuple(row[1 + len(summary.measures):]) for row in rows])
+
+
+def _subtract(cursor, summary: Summary, rows: List[Tuple]):
+    cursor.executemany('UPDATE {} SET {} WHERE {} = %s'.format(
+        summary.table, ', '.join(f'{column} = {column} - %s' for column in summary.measures), summary.key),
+        [_measures(summary, row) + (row[0],) for row in rows])
+
+
+def _recompute_maxima(cursor, summary: Summary, keys: Set):
+    """Set each group's maxima from the base tables as they are now (NULL once the group is empty)"""
+    keys = [key for key in keys if key is not None]
+    missing = (None,) * len(summary.maxima)
+    for start in range(0, len(keys), ID_CHUNK):
+        chunk = keys[start:start + ID_CHUNK]
+        current = {row[0]: row[1 + len(summary.measures):] for row in _aggregate(
+            cursor, summary, '{} IN ({})'.format(summary.key_expr, ','.join(['%s'] * len(chunk))), tuple(chunk))}
+        cursor.executemany('UPDATE {} SET {} WHERE {} = %s'.format(
+            summary.table, ', '.join(f'{column} = %s' for column in summary.maxima), summary.key),
+            [tuple(current.get(key, missing)) + (key,) for key in chunk])
+
+
+def apply_delta(cursor, tables: Iterable[str], student_ids: Set[int], sign: int = 1,
+                removed: Optional[Dict[str, Set]] = None) -> Dict[str, Set]:
+    """Add (sign=1) or remove (sign=-1) the contribution of these students' current rows
+    to every summary built from any of `tables`.
+
+    Call with sign=-1 before changing existing rows and sign=1 after, inside
+    the same transaction as the write, passing all tables being changed at once.
+    The sign=-1 call returns the groups it took rows from; pass them as
+    `removed` to the sign=1 call, which recomputes the maxima (a maximum
+    cannot be un-applied) of those groups and the ones it adds to, now that
+    the write has happened.
+    """
+    touched: Dict[str, Set] = {}
+    if not student_ids:
+        return touched
+    for summary in summaries_for(tables):
+        keys = touched.setdefault(summary.table, set())
+        for where, params in _id_predicates(summary.id_column, student_ids):
+            rows = _aggregate(cursor, summary, where, params)
+            keys.update(row[0] for row in rows)
+            if sign > 0:
+                _add(cursor, summary, rows)
+            else:
+                _subtract(cursor, summary, rows)
+        if sign > 0 and summary.maxima and removed is not None:
+            _recompute_maxima(cursor, summary, keys | removed.get(summary.table, set()))
+    return touched
+
+
+def create_summary_tables(cursor):
+    for summary in SUMMARIES:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {summary.table} ({summary.columns})')
+
+
+def clear_summaries(cursor):
+    for summary in SUMMARIES:
+        cursor.execute(f'DELETE FROM {summary.table}')
+
+
+def rebuild_summaries(cursor):
+    """Recompute every summary from the base tables"""
+    clear_summaries(cursor)
+    for summary in SUMMARIES:
+        _add(cursor, summary, _aggregate(cursor, summary))
+
+
+def check_summaries(cursor, tolerance: float = 1e-6) -> List[str]:
+    """Differences between the summary tables and the live aggregates (empty when consistent)"""
+    problems = []
+    for summary in SUMMARIES:
+        columns = summary.measures + summary.maxima
+        live = {row[0]: row[1:] for row in _aggregate(cursor, summary)}
+        cursor.execute('SELECT {}, {} FROM {}'.format(summary.key, ', '.join(columns), summary.table))
+        # Groups whose rows were all removed stay behind with zero counts
+        stored = {row[0]: row[1:] for row in cursor.fetchall() if any(row[1:1 + len(summary.measures)])}
+        for key in sorted(set(live) | set(stored), key=str):
+            expected, actual = live.get(key), stored.get(key)
+            if expected is None or actual is None or not all(
+                    _close(e, a, tolerance) for e, a in zip(expected, actual)):
+                problems.append(f"{summary.table}[{key}]: live {expected}, stored {actual}")
+    return problems
+
+
+def _close(expected, actual, tolerance: float) -> bool:
+    if expected is None or actual is None:
+        return (expected or 0) == (actual or 0)
+    if isinstance(expected, (int, float)) or hasattr(expected, 'as_integer_ratio'):
+        return abs(float(expected) - float(actual)) <= tolerance * max(1.0, abs(float(expected)))
+    return str(expected) == str(actual)
+
+
+def check_maxima_regression(records: int = 500) -> List[str]:
+    """Lower, move out of its group and delete the row holding a company's latest
+    placement on a scratch SQLite database; the inconsistencies left after each step"""
+    import tempfile
+    from backends import SQLiteBackend
+    from data_generator import BulkDataGenerator
+    from database import DatabaseManager
+    from seed import seed_database
+
+    latest = ("SELECT student_id FROM placements WHERE placement_status = 'Placed' "
+              "ORDER BY placement_date DESC, student_id LIMIT 1")
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(backend=SQLiteBackend(f'{directory}/summaries_check.db'))
+        db.create_tables()
+        seed_database(db, records, generator=BulkDataGenerator(records, seed=1, workers=1))
+        with db.session():
+            holder = db.execute_query(latest, use_cache=False)[0][0]
+            db.upsert_data('placements', [(holder, '2000-01-01')], columns=['student_id', 'placement_date'])
+            problems += [f"lowered: {problem}" for problem in check_summaries(db.cursor)]
+
+            holder = db.execute_query(latest, use_cache=False)[0][0]
+            db.upsert_data('placements', [(holder, 'Not Ready')], columns=['student_id', 'placement_status'])
+            problems += [f"moved out: {problem}" for problem in check_summaries(db.cursor)]
+
+            holder = db.execute_query(latest, use_cache=False)[0][0]
+            removed = apply_delta(db.cursor, ['placements'], {holder}, -1)
+            db.cursor.execute("DELETE FROM placements WHERE student_id = %s", (holder,))
+            apply_delta(db.cursor, ['placements'], {holder}, 1, removed)
+            db.conn.commit()
+            problems += [f"deleted: {problem}" for problem in check_summaries(db.cursor)]
+    return problems
+
+
+def main():
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the insight summary tables")
+    parser.add_argument('--rebuild', action='store_true', help="recompute every summary from the base tables")
+    parser.add_argument('--check', action='store_true', help="compare the summaries with the live aggregates")
+    parser.add_argument('--check-maxima', action='store_true',
+                        help="regression check: lower and delete maximum-holding rows on a scratch database")
+    args = parser.parse_args()
+
+    if args.check_maxima:
+        problems = check_maxima_regression()
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} inconsistencies after lowering, moving and deleting the latest placement")
+        sys.exit(1 if problems else 0)
+
+    db = DatabaseManager()
+    db.create_tables()
+    db.connect()
+    try:
+        if args.rebuild:
+            db.rebuild_summaries()
+            print(f"Rebuilt {', '.join(SUMMARY_TABLES)}")
+        if args.check or not args.rebuild:
+            problems = check_summaries(db.cursor)
+            for problem in problems:
+                print(problem)
+            print(f"{len(problems)} inconsistencies")
+            if problems:
+                sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()